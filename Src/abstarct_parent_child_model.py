@@ -1,7 +1,17 @@
-import uuid
-from typing import List, Dict, Optional, Any
+import sys
+from typing import List, Dict, Optional, Any, Tuple, Callable
+
+from uuid_pool import new_uuid
 
 class AbstractElement:
+    __slots__ = ("uuid", "name", "description", "hierarchy_digits", "sibling_digits",
+                 "level_index", "sibling_index", "code_length", "parent_code", "self_code",
+                 "full_code", "attributes", "children_codes", "connected_elements",
+                 "functions", "_code_fmt")
+
+    # (hierarchy_digits, sibling_digits) -> (root parent code, code formatter), shared by all elements
+    _LAYOUT_CACHE: Dict[Tuple[int, int], Tuple[str, Callable[[int, int], str]]] = {}
+
     def __init__(self,
                  name: str,
                  description: str = "",
@@ -11,20 +21,23 @@ class AbstractElement:
                  level_index: Optional[int] = None,
                  sibling_index: Optional[int] = None,
                  attributes: Optional[Dict[str, Any]] = None):
-        self.uuid = str(uuid.uuid4())
+        self.uuid = new_uuid()
         self.name = name
         self.description = description
         self.hierarchy_digits = hierarchy_digits
         self.sibling_digits = sibling_digits
         self.level_index = level_index if level_index is not None else 0
         self.sibling_index = sibling_index if sibling_index is not None else 1
-        self.code_length = 2 * hierarchy_digits + 2 * sibling_digits  # parent code + self code
+        half = hierarchy_digits + sibling_digits
+        self.code_length = 2 * half  # parent code + self code
+        layout = self._LAYOUT_CACHE.get((hierarchy_digits, sibling_digits))
+        if layout is None:
+            layout = (sys.intern('0' * half), f"{{:0{hierarchy_digits}d}}{{:0{sibling_digits}d}}".format)
+            self._LAYOUT_CACHE[(hierarchy_digits, sibling_digits)] = layout
+        zero, self._code_fmt = layout
 
         # Ensure parent_code is the right length (or zeros for root)
-        if parent_code and len(parent_code) == self.code_length // 2:
-            self.parent_code = parent_code
-        else:
-            self.parent_code = '0' * (self.code_length // 2)
+        self.parent_code = sys.intern(parent_code) if parent_code and len(parent_code) == half else zero
 
         # Generate element code
         self.self_code = self.generate_code(self.level_index, self.sibling_index)
@@ -38,7 +51,7 @@ class AbstractElement:
         self.functions: Dict[str, Any] = {}  # {name: function}
 
     def generate_code(self, level: int, sibling: int) -> str:
-        return str(level).zfill(self.hierarchy_digits) + str(sibling).zfill(self.sibling_digits)
+        return self._code_fmt(level, sibling)
 
     def add_child(self, child: 'AbstractElement') -> None:
         self.children_codes.append(child.full_code)
@@ -79,17 +92,20 @@ class AbstractElement:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AbstractElement':
+        hd = data.get('hierarchy_digits', 2)
+        self_code = data['self_code']
         obj = cls(
             name=data['name'],
             description=data.get('description', ''),
             parent_code=data.get('parent_code'),
-            hierarchy_digits=data.get('hierarchy_digits', 2),
+            hierarchy_digits=hd,
             sibling_digits=data.get('sibling_digits', 4),
-            level_index=int(data['self_code'][:data.get('hierarchy_digits', 2)]),
-            sibling_index=int(data['self_code'][data.get('hierarchy_digits', 2):]),
-            attributes=data.get('attributes', {})
+            level_index=int(self_code[:hd]),
+            sibling_index=int(self_code[hd:]),
+            attributes=data.get('attributes') or {}
         )
-        obj.uuid = data.get('uuid', str(uuid.uuid4()))
+        if 'uuid' in data:
+            obj.uuid = data['uuid']
         obj.children_codes = data.get('children_codes', [])
         # connected_elements/functions not restored by default in simple deserialization
         return obj
@@ -0,0 +1,79 @@
+"""
+background.py
+
+Run slow, Tk-free work (JSON loading, index building) off the Tk main thread.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from deferred_save import flush_saves
+
+POLL_MS = 50
+
+
+def run_in_background(root, work, on_done, poll_ms=POLL_MS):
+    """
+    Run work() on a daemon thread and call on_done(result) on the Tk thread.
+    The result is picked up by polling with root.after, so Tk is never touched
+    from the worker. An exception raised by work is re-raised on the Tk thread.
+    """
+    results = queue.Queue(maxsize=1)
+
+    def runner():
+        try:
+            results.put((True, work()))
+        except Exception as exc:
+            results.put((False, exc))
+
+    def poll():
+        try:
+            ok, value = results.get_nowait()
+        except queue.Empty:
+            root.after(poll_ms, poll)
+            return
+        if not ok:
+            raise value
+        on_done(value)
+
+    threading.Thread(target=runner, daemon=True).start()
+    root.after(poll_ms, poll)
+
+
+def load_in_parallel(*loaders):
+    """
+    Call each zero-argument loader on its own thread and return their results
+    in order. Meant for independent file loads, whose reads can overlap.
+    """
+    with ThreadPoolExecutor(max_workers=len(loaders)) as pool:
+        futures = [pool.submit(loader) for loader in loaders]
+        return tuple(f.result() for f in futures)
+
+
+def load_models_in_background(root, loaders, on_done, replaces=()):
+    """
+    Build hierarchy models (e.g. lambda: SystemModel(path)) from loaders on a
+    worker thread, reading their files concurrently and building their tree
+    indexes there too. Back on the Tk thread the models' debounced saves are
+    attached to root, then on_done(models) is called with them in order.
+
+    replaces are the models the GUI shows (and lets the user edit) while the
+    worker runs. Their pending saves are flushed before on_done, and each new
+    model re-reads its files if that changed them, so edits made during the
+    load are neither lost nor missing from the new models.
+    """
+    def work():
+        models = load_in_parallel(*loaders)
+        for model in models:
+            model.children_by_parent()
+        return models
+
+    def done(models):
+        flush_saves(*replaces)
+        for model in models:
+            model.load()  # a no-op unless the files changed since the worker read them
+            model.save_root = root
+        on_done(models)
+
+    run_in_background(root, work, done)
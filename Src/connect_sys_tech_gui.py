@@ -2,6 +2,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from system_model import SystemModel
 from technology_model import TechnologyModel
+from tree_utils import frozen_tree, insert_lazy_nodes, expand_lazy_node, patch_listbox
+from background import load_models_in_background
+from deferred_save import flush_saves
 
 class ConnectSysTechGUI:
     def __init__(self, root):
@@ -10,7 +13,12 @@ class ConnectSysTechGUI:
 
         self.system_model = SystemModel()
         self.technology_model = TechnologyModel()
+        # Saves are debounced on this root's event loop and written off the Tk thread
+        self.system_model.save_root = self.technology_model.save_root = root
         self.selected_sys_code = None
+        self._listed_tech_codes = []
+        self._current_tech_rows = []  # text of each tech_listbox line
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # UI Frames
         main_frame = tk.Frame(root)
@@ -22,12 +30,14 @@ class ConnectSysTechGUI:
         self.sys_tree = ttk.Treeview(sys_frame, height=25)
         self.sys_tree.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
         self.sys_tree.bind("<<TreeviewSelect>>", self.on_sys_tree_select)
+        self.sys_tree.bind("<<TreeviewOpen>>", self._on_sys_tree_open)
 
         # Tech Tree
         tech_frame = tk.LabelFrame(main_frame, text="Technology Hierarchy")
         tech_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=8, pady=8)
         self.tech_tree = ttk.Treeview(tech_frame, height=25, selectmode='extended')
         self.tech_tree.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
+        self.tech_tree.bind("<<TreeviewOpen>>", self._on_tech_tree_open)
 
         # Assignment panel
         panel_frame = tk.Frame(main_frame)
@@ -55,46 +65,49 @@ class ConnectSysTechGUI:
     # --- System Tree ---
     def refresh_system_tree(self):
         self.sys_tree.delete(*self.sys_tree.get_children())
-        roots = [i for i in self.system_model.items.values() if i.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_sys_tree_node(root, "")
-    def insert_sys_tree_node(self, item, parent):
-        node_id = self.sys_tree.insert(parent, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for child_code in item.children_codes:
-            child = self.system_model.get_item(child_code)
-            if child:
-                self.insert_sys_tree_node(child, node_id)
+        # Only roots are inserted; subtrees are filled in on <<TreeviewOpen>>
+        roots, self._sys_children = self.system_model.children_by_parent()
+        with frozen_tree(self.sys_tree):
+            insert_lazy_nodes(self.sys_tree, "", roots, self._sys_children)
+
+    def _on_sys_tree_open(self, event):
+        expand_lazy_node(self.sys_tree, self.sys_tree.focus(), self._sys_children)
 
     # --- Technology Tree ---
     def refresh_technology_tree(self):
         self.tech_tree.delete(*self.tech_tree.get_children())
-        roots = [j for j in self.technology_model.items.values() if j.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_tech_tree_node(root, "")
-    def insert_tech_tree_node(self, item, parent):
-        node_id = self.tech_tree.insert(parent, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for child_code in item.children_codes:
-            child = self.technology_model.get_item(child_code)
-            if child:
-                self.insert_tech_tree_node(child, node_id)
+        # Only roots are inserted; subtrees are filled in on <<TreeviewOpen>>
+        roots, self._tech_children = self.technology_model.children_by_parent()
+        with frozen_tree(self.tech_tree):
+            insert_lazy_nodes(self.tech_tree, "", roots, self._tech_children)
+
+    def _on_tech_tree_open(self, event):
+        expand_lazy_node(self.tech_tree, self.tech_tree.focus(), self._tech_children)
 
     # --- Assignment Display ---
     def on_sys_tree_select(self, event):
         sel = self.sys_tree.selection()
-        self.tech_listbox.delete(0, tk.END)
         if not sel:
             self.selected_sys_code = None
             self.sys_label.config(text="-")
+            self.show_assigned_techs([])
             return
         code = self.sys_tree.item(sel[0], "values")[0]
         self.selected_sys_code = code
         item = self.system_model.get_item(code)
         if item:
             self.sys_label.config(text=f"{item.name}\n({item.full_code})")
-            for tech_code in item.technology_refs:
-                tech = self.technology_model.get_item(tech_code)
-                tline = f"{tech.name} | {tech.full_code}" if tech else tech_code
-                self.tech_listbox.insert(tk.END, tline)
+        self.show_assigned_techs(sorted(item.technology_refs) if item else [])
+
+    def show_assigned_techs(self, tech_codes):
+        # Only the listbox lines that differ from what is shown are touched
+        get_tech = self.technology_model.get_item
+        rows = []
+        for tech_code in tech_codes:
+            tech = get_tech(tech_code)
+            rows.append(f"{tech.name} | {tech.full_code}" if tech else tech_code)
+        patch_listbox(self.tech_listbox, self._current_tech_rows, rows)
+        self._listed_tech_codes = list(tech_codes)  # tech code per listbox row
 
     def assign_technologies(self):
         if not self.selected_sys_code:
@@ -116,28 +129,38 @@ class ConnectSysTechGUI:
         sel = self.tech_listbox.curselection()
         if not sel:
             return
-        idx = sel[0]
-        code_line = self.tech_listbox.get(idx)
-        tech_code = code_line.split("|")[-1].strip()
-        item = self.system_model.get_item(self.selected_sys_code)
-        if item and tech_code in item.technology_refs:
-            item.technology_refs.remove(tech_code)
-            self.system_model.save()
+        tech_code = self._listed_tech_codes[sel[0]]
+        self.system_model.unassign_technology(self.selected_sys_code, tech_code)
         self.on_sys_tree_select(None)
         self.status_popup("Unassignment complete – saved.")
 
     # --- Persist/refresh ---
+    def on_close(self):
+        try:
+            flush_saves(self.system_model, self.technology_model)
+        except Exception as exc:
+            messagebox.showerror("Save Failed", f"Recent changes could not be saved:\n{exc}")
+        finally:
+            self.root.destroy()
+
     def save_all(self):
         self.system_model.save()
         self.technology_model.save()
         self.status_popup("Saved all data.")
 
     def refresh_all(self):
-        self.system_model.load()
-        self.technology_model.load()
+        # Reload and index both models on a worker; the trees are rebuilt on the Tk thread
+        sys_path, tech_path = self.system_model.db_path, self.technology_model.db_path
+        flush_saves(self.system_model, self.technology_model)
+        load_models_in_background(self.root, (lambda: SystemModel(sys_path), lambda: TechnologyModel(tech_path)),
+                                  self._apply_reload,
+                                  replaces=(self.system_model, self.technology_model))
+
+    def _apply_reload(self, models):
+        self.system_model, self.technology_model = models
         self.refresh_system_tree()
         self.refresh_technology_tree()
-        self.tech_listbox.delete(0, tk.END)
+        self.show_assigned_techs([])
         self.sys_label.config(text="-")
         self.selected_sys_code = None
 
@@ -9,8 +9,14 @@ Saves connections to <project_folder>/connections.json.
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
-import json
-import uuid
+import sys
+import atexit
+from dataclasses import dataclass, field
+
+from json_io import iter_json_list, iter_json_lines, append_json_line, write_json
+from deferred_save import JOURNAL_LIMIT
+from uuid_pool import new_uuid
+from tree_utils import fill_rows
 
 # ✅ Standard connection types
 CONNECTION_TYPES = [
@@ -30,15 +36,25 @@ CONNECTION_TYPES = [
     ("Custom...", "CUST")
 ]
 
+# Label -> id lookup and combobox labels, built once at import
+CONNECTION_TYPE_IDS = dict(CONNECTION_TYPES)
+CONNECTION_LABELS = tuple(label for label, _ in CONNECTION_TYPES)
+
 # ✅ Basic data model
+# A slots dataclass so orjson can serialize it directly as its six fields.
+@dataclass(slots=True)
 class Connection:
-    def __init__(self, source, conn_type_id, conn_type_label, target, description=""):
-        self.uuid = str(uuid.uuid4())
-        self.source = source
-        self.type_id = conn_type_id
-        self.type_label = conn_type_label
-        self.target = target
-        self.description = description
+    uuid: str = field(default_factory=new_uuid, init=False)
+    source: str
+    type_id: str
+    type_label: str
+    target: str
+    description: str = ""
+
+    def __post_init__(self):
+        # Type ids/labels come from a small closed set; share one string object each
+        self.type_id = sys.intern(self.type_id)
+        self.type_label = sys.intern(self.type_label)
 
     def to_dict(self):
         return {
@@ -51,54 +67,137 @@ class Connection:
         }
 
 class ConnectionManager:
+    """
+    Connections are kept in save_path as a JSON list. Each add_connection only
+    appends one line to a JSON-lines journal beside it; save() folds the
+    journal back into save_path once it holds JOURNAL_LIMIT records, on
+    flush, on close and at interpreter exit, and when load() finds lines it
+    cannot read. Both files are written through handles kept open between
+    saves.
+    """
+
     def __init__(self, save_path):
         self.save_path = save_path
+        self.journal_path = os.path.splitext(save_path)[0] + ".jsonl"
+        self._journal = None   # append handle, opened on first add
+        self._snapshot = None  # read/write handle on save_path, opened on first save
+        self._journaled = 0   # records in the journal but not yet in save_path
         self.connections = []
+        # Lookup indexes by element code, kept in step with self.connections
+        self.by_source = {}
+        self.by_target = {}
         self.load()
+        atexit.register(self.close)
+
+    def _index(self, conn: Connection):
+        self.by_source.setdefault(conn.source, []).append(conn)
+        self.by_target.setdefault(conn.target, []).append(conn)
 
     def add_connection(self, conn: Connection):
         self.connections.append(conn)
-        self.save()
+        self._index(conn)
+        self._append(conn)
+
+    def _append(self, conn: Connection):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "ab")
+        append_json_line(self._journal, conn, default=Connection.to_dict)
+        self._journal.flush()
+        self._journaled += 1
+        if self._journaled >= JOURNAL_LIMIT:
+            self.save()
+
+    def flush(self):
+        """Compact if anything has been journaled since the last save."""
+        if self._journaled:
+            self.save()
+
+    def close(self):
+        """Compact pending additions and release the file handles."""
+        self.flush()
+        for f in (self._journal, self._snapshot):
+            if f is not None:
+                f.close()
+        self._journal = self._snapshot = None
+        # Closed explicitly: drop the exit hook so the manager can be freed
+        atexit.unregister(self.close)
 
     def save(self):
-        with open(self.save_path, "w") as f:
-            json.dump([c.to_dict() for c in self.connections], f, indent=2)
+        if self._snapshot is None:
+            self._snapshot = open(self.save_path, "r+b" if os.path.exists(self.save_path) else "w+b")
+        self._snapshot.seek(0)
+        self._snapshot.truncate()
+        write_json(self._snapshot, self.connections, indent=False, default=Connection.to_dict)
+        self._snapshot.flush()
+        # save_path now holds every connection, so the journal can go
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journaled = 0
+
+    def _add_record(self, item):
+        conn = Connection(
+            item["source"], item["type_id"], item["type_label"],
+            item["target"], item.get("description", "")
+        )
+        if "uuid" in item:
+            conn.uuid = item["uuid"]
+        self.connections.append(conn)
+        self._index(conn)
 
     def load(self):
         self.connections.clear()
+        self.by_source.clear()
+        self.by_target.clear()
+        self._journaled = 0
         if os.path.exists(self.save_path):
-            with open(self.save_path, "r") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict):
-                            conn = Connection(
-                                item["source"], item["type_id"], item["type_label"],
-                                item["target"], item.get("description", "")
-                            )
-                            conn.uuid = item.get("uuid", str(uuid.uuid4()))
-                            self.connections.append(conn)
-
-# ✅ GUI class
+            for item in iter_json_list(self.save_path):
+                if isinstance(item, dict):
+                    self._add_record(item)
+        if os.path.exists(self.journal_path):
+            # Replay adds made since the last compaction; skip any that a
+            # compaction interrupted before deleting the journal already saved
+            seen = {c.uuid for c in self.connections}
+            bad_lines = []
+            for item in iter_json_lines(self.journal_path, bad_lines):
+                if isinstance(item, dict) and item.get("uuid") not in seen:
+                    self._add_record(item)
+                    self._journaled += 1
+            if bad_lines:
+                # Rewrite rather than append after a damaged line
+                self.save()
+            elif not self._journaled:
+                os.remove(self.journal_path)
+
 class ConnectionGUI:
+    REFRESH_DELAY_MS = 50
+
     def __init__(self, root, system_elements, save_folder):
         self.root = root
+        self._refresh_pending = None
         self.system_elements = system_elements
         self.save_path = os.path.join(save_folder, "connections.json")
         self.manager = ConnectionManager(self.save_path)
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Option strings are built once and shared by both element comboboxes,
+        # along with a display -> code map for reading selections back
+        self._code_by_display = self._element_codes()
+        self._element_cache = list(self._code_by_display)
 
         tk.Label(root, text="Source Element").grid(row=0, column=0, sticky="e", padx=4)
-        self.src_cb = ttk.Combobox(root, values=self._element_list(), width=42)
+        self.src_cb = ttk.Combobox(root, values=self._element_cache, width=42)
         self.src_cb.grid(row=0, column=1, padx=4)
-        self.src_cb.bind("<<ComboboxSelected>>", lambda e: self.refresh_table())
+        self.src_cb.bind("<<ComboboxSelected>>", lambda e: self._schedule_refresh())
 
         tk.Label(root, text="Target Element").grid(row=1, column=0, sticky="e", padx=4)
-        self.tgt_cb = ttk.Combobox(root, values=self._element_list(), width=42)
+        self.tgt_cb = ttk.Combobox(root, values=self._element_cache, width=42)
         self.tgt_cb.grid(row=1, column=1, padx=4)
-        self.tgt_cb.bind("<<ComboboxSelected>>", lambda e: self.refresh_table())
+        self.tgt_cb.bind("<<ComboboxSelected>>", lambda e: self._schedule_refresh())
 
         tk.Label(root, text="Connection Type").grid(row=2, column=0, sticky="e", padx=4)
-        self.conn_cb = ttk.Combobox(root, values=[label for label, _ in CONNECTION_TYPES], state="readonly", width=42)
+        self.conn_cb = ttk.Combobox(root, values=CONNECTION_LABELS, state="readonly", width=42)
         self.conn_cb.set("Mechanical")
         self.conn_cb.grid(row=2, column=1, padx=4)
         self.conn_cb.bind("<<ComboboxSelected>>", self.on_conn_type_change)
@@ -122,10 +221,20 @@ class ConnectionGUI:
         self.conn_table.heading("target", text="Target")
         self.conn_table.heading("desc", text="Description")
         self.conn_table.grid(row=6, column=1, padx=4, pady=5)
+        self._conn_row_ids = []  # pooled table item ids, reused across refreshes
+
+    def on_close(self):
+        self.manager.close()
+        self.root.destroy()
 
     # ✅ Build input options
-    def _element_list(self):
-        return [f"{e['name']} | {e['full_code']}" for e in self.system_elements]
+    def _element_codes(self):
+        return {f"{e['name']} | {e['full_code']}": e['full_code'] for e in self.system_elements}
+
+    def _code_of(self, display):
+        # Cached lookup; typed-in text falls back to parsing "name | code"
+        code = self._code_by_display.get(display)
+        return code if code is not None else display.split("|")[-1].strip()
 
     def on_conn_type_change(self, event):
         if self.conn_cb.get() == "Custom...":
@@ -143,10 +252,10 @@ class ConnectionGUI:
             messagebox.showerror("Error", "Cannot connect element to itself.")
             return
 
-        source_code = self.src_cb.get().split("|")[-1].strip()
-        target_code = self.tgt_cb.get().split("|")[-1].strip()
+        source_code = self._code_of(self.src_cb.get())
+        target_code = self._code_of(self.tgt_cb.get())
         type_label = self.conn_cb.get()
-        type_id = dict(CONNECTION_TYPES).get(type_label, "CUST")
+        type_id = CONNECTION_TYPE_IDS.get(type_label, "CUST")
 
         if type_label == "Custom...":
             type_label = self.custom_entry.get().strip()
@@ -164,25 +273,30 @@ class ConnectionGUI:
         self.conn_cb.set("Mechanical")
         self.refresh_table()
 
+    # Combobox events can arrive in bursts; coalesce them into one refresh
+    def _schedule_refresh(self):
+        if self._refresh_pending is not None:
+            self.root.after_cancel(self._refresh_pending)
+        self._refresh_pending = self.root.after(self.REFRESH_DELAY_MS, self._do_refresh)
+
+    def _do_refresh(self):
+        self._refresh_pending = None
+        self.refresh_table()
+
     def refresh_table(self):
-        self.conn_table.delete(*self.conn_table.get_children())
         selected_src = self.src_cb.get()
         selected_tgt = self.tgt_cb.get()
 
-        src_code = selected_src.split("|")[-1].strip() if selected_src else None
-        tgt_code = selected_tgt.split("|")[-1].strip() if selected_tgt else None
-
-        for c in self.manager.connections:
-            match = (
-                (src_code and c.source == src_code) or
-                (tgt_code and c.target == tgt_code) or
-                (src_code == c.source and tgt_code == c.target)
-            )
-            if match:
-                self.conn_table.insert(
-                    "", tk.END,
-                    values=(c.source, c.type_label, c.target, c.description)
-                )
+        src_code = self._code_of(selected_src) if selected_src else None
+        tgt_code = self._code_of(selected_tgt) if selected_tgt else None
+
+        # Connections leaving the source or entering the target, via the manager's indexes
+        rows = list(self.manager.by_source.get(src_code, ())) if src_code else []
+        if tgt_code:
+            rows += [c for c in self.manager.by_target.get(tgt_code, ()) if c.source != src_code]
+        # Row tuples are built before touching the widget; fill_rows reuses the pooled table rows
+        matches = [(c.source, c.type_label, c.target, c.description) for c in rows]
+        fill_rows(self.conn_table, self._conn_row_ids, matches)
 
 # 🔧 Entry point
 if __name__ == "__main__":
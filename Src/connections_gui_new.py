@@ -8,8 +8,8 @@ with optional custom description. Connections stored as unique-UUID entries in a
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
-import json
-import uuid
+from json_io import iter_json_list, dump_json
+from uuid_pool import new_uuid
 
 # Standard connection types with internal IDs
 CONNECTION_TYPES = [
@@ -29,9 +29,15 @@ CONNECTION_TYPES = [
     ("Custom...", "CUST"),
 ]
 
+# Label -> id lookup and combobox labels, built once at import
+CONNECTION_TYPE_IDS = dict(CONNECTION_TYPES)
+CONNECTION_LABELS = tuple(label for label, _ in CONNECTION_TYPES)
+
 class Connection:
+    __slots__ = ("uuid", "source", "type_id", "type_label", "target", "description")
+
     def __init__(self, source_code, conn_type_id, conn_type_label, target_code, description=""):
-        self.uuid = str(uuid.uuid4())
+        self.uuid = new_uuid()
         self.source = source_code
         self.type_id = conn_type_id
         self.type_label = conn_type_label
@@ -59,17 +65,18 @@ class ConnectionManager:
         self.save()
 
     def save(self):
-        with open(self.save_path, "w") as f:
-            json.dump([c.to_dict() for c in self.connections], f, indent=2)
+        dump_json(self.save_path, [c.to_dict() for c in self.connections])
 
     def load(self):
         if os.path.exists(self.save_path):
-            with open(self.save_path, "r") as f:
-                for entry in json.load(f):
-                    self.connections.append(Connection(
-                        entry["source"], entry["type_id"], entry["type_label"],
-                        entry["target"], entry.get("description", "")
-                    ))
+            for entry in iter_json_list(self.save_path):
+                conn = Connection(
+                    entry["source"], entry["type_id"], entry["type_label"],
+                    entry["target"], entry.get("description", "")
+                )
+                if "uuid" in entry:
+                    conn.uuid = entry["uuid"]
+                self.connections.append(conn)
 
 class ConnectionGUI:
     def __init__(self, root, system_elements, project_folder):
@@ -85,7 +92,7 @@ class ConnectionGUI:
 
         self.src_cb = ttk.Combobox(root, values=[f"{e['name']} | {e['full_code']}" for e in self.system_elements], width=38)
         self.src_cb.grid(row=0, column=1, padx=4, pady=5)
-        self.conn_cb = ttk.Combobox(root, values=[lbl for lbl, _ in CONNECTION_TYPES], width=38, state="readonly")
+        self.conn_cb = ttk.Combobox(root, values=CONNECTION_LABELS, width=38, state="readonly")
         self.conn_cb.set(CONNECTION_TYPES[0][0])
         self.conn_cb.grid(row=1, column=1, padx=4, pady=5)
         self.tgt_cb = ttk.Combobox(root, values=[f"{e['name']} | {e['full_code']}" for e in self.system_elements], width=38)
@@ -118,8 +125,7 @@ class ConnectionGUI:
         src_code = src.split("|")[-1].strip()
         tgt_code = tgt.split("|")[-1].strip()
         ctype_label = self.conn_cb.get()
-        idx = [lbl for lbl, _ in CONNECTION_TYPES].index(ctype_label)
-        ctype_id = CONNECTION_TYPES[idx][1]
+        ctype_id = CONNECTION_TYPE_IDS[ctype_label]
         if ctype_label == "Custom...":
             label = self.custom_type_entry.get().strip()
             if not label:
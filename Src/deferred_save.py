@@ -0,0 +1,214 @@
+"""
+deferred_save.py
+
+Debounced, off-thread, incremental saving for the JSON-backed models.
+"""
+
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from json_io import GZIP_SUFFIX, open_json, write_json, append_json_line, iter_json_lines
+
+# Edits made within this window are written out together
+SAVE_DELAY_MS = 500
+# Journal length at which the next save rewrites db_path instead of appending
+JOURNAL_LIMIT = 500
+
+
+class DeferredSaveMixin:
+    """
+    Adds schedule_save()/save()/flush_save() to a model with a db_path, an
+    items dict keyed by full_code and an export() returning its JSON records.
+
+    schedule_save(*codes) records which items changed. The next write appends
+    just those items (or a {"full_code": ..., "removed": true} marker for
+    codes no longer in items) to a JSON-lines journal beside db_path; load()
+    replays it with _replay_journal(), which skips unreadable lines and then
+    makes the next write a full one. save() rewrites db_path in full and
+    drops the journal, as does any save once the journal reaches
+    JOURNAL_LIMIT records, while db_path does not exist yet, or when
+    schedule_save() is called without codes.
+
+    With save_root set to a Tk root, schedule_save() coalesces calls made within
+    SAVE_DELAY_MS into one write. Records are snapshotted on the Tk thread and
+    written by a single worker thread (full rewrites via temp file +
+    os.replace), so writes land in the order they were requested, and save()
+    returns once its snapshot is queued; flush_save() waits for the disk.
+    Without save_root every schedule_save() and save() writes immediately.
+    A failed write raises (on the Tk thread, via save_root.after, when it ran
+    in the background) and leaves the next save to rewrite everything.
+    Files are unindented, and db_path is gzip-compressed when it ends in .gz.
+    """
+
+    def _init_deferred_save(self):
+        self.save_root = None
+        self.journal_path = os.path.splitext(self.db_path)[0] + ".jsonl"
+        self._dirty = set()       # codes changed since the last write
+        self._dirty_all = False   # next write must be a full rewrite
+        self._journaled = 0       # records in the journal but not in db_path
+        self._loaded_stamp = None # _file_stamp() when the files last matched items
+        self._save_after = None   # Tk after id of the scheduled save
+        self._save_future = None  # last write handed to the worker
+        self._failed_future = None  # last write whose failure has been handled
+        self._save_exec = ThreadPoolExecutor(max_workers=1)
+
+    def schedule_save(self, *codes):
+        """Save the items with these codes soon; with no codes, save everything."""
+        if codes:
+            self._dirty.update(codes)
+        else:
+            self._dirty_all = True
+        if self.save_root is None:
+            self._wait_save(self._submit_save())
+        elif self._save_after is None:
+            self._save_after = self.save_root.after(SAVE_DELAY_MS, self._submit_save)
+
+    def _submit_save(self):
+        self._save_after = None
+        # Snapshot here; the worker only serializes and writes it
+        if (self._dirty_all or self._journaled + len(self._dirty) >= JOURNAL_LIMIT
+                or not os.path.exists(self.db_path)):
+            job = (self._write, self.export())
+            self._journaled = 0
+        else:
+            items = self.items
+            records = [items[code].to_dict() if code in items else {"full_code": code, "removed": True}
+                       for code in self._dirty]
+            job = (self._append, records)
+            self._journaled += len(records)
+        self._dirty.clear()
+        self._dirty_all = False
+        self._save_future = future = self._save_exec.submit(*job)
+        if self.save_root is not None:
+            self.save_root.after(SAVE_DELAY_MS, self._check_save, future)
+        return future
+
+    def _check_save(self, future):
+        """Tk-thread check on a queued write; a failure is re-raised here so Tk reports it."""
+        if not future.done():
+            self.save_root.after(SAVE_DELAY_MS, self._check_save, future)
+            return
+        error = self._take_failure(future)
+        if error is not None:
+            raise error
+
+    def _wait_save(self, future):
+        """Wait for a queued write, raising its error if it failed."""
+        error = self._take_failure(future)
+        if error is not None:
+            raise error
+
+    def _take_failure(self, future):
+        """
+        Return the error of a failed write the first time it is seen, else None.
+        The items it held are then saved again by the next write, in full,
+        since a failed append may have left a partial line in the journal.
+        """
+        error = future.exception()
+        if error is None or future is self._failed_future:
+            return None
+        self._failed_future = future
+        self._dirty_all = True
+        return error
+
+    def save(self):
+        """Rewrite db_path with all records now (waiting for the disk only without save_root)."""
+        if self._save_after is not None:
+            self.save_root.after_cancel(self._save_after)
+        self._dirty_all = True
+        future = self._submit_save()
+        if self.save_root is None:
+            self._wait_save(future)
+
+    def flush_save(self, compact=False):
+        """
+        Run a scheduled save (or the retry of a failed one) immediately and
+        wait for writes in flight, raising if the last failed. With compact
+        (on close), a non-empty journal is folded into db_path as well, so
+        readers that ignore the journal see every edit.
+        """
+        if self._save_after is not None:
+            self.save_root.after_cancel(self._save_after)
+            self._save_after = None
+        if compact and (self._journaled or self._dirty):
+            self._dirty_all = True
+        if self._dirty or self._dirty_all:
+            self._submit_save()
+        if self._save_future is not None:
+            self._wait_save(self._save_future)
+
+    def _write(self, data):
+        tmp_path = self.db_path + ".tmp"
+        with open_json(tmp_path, "wb", compressed=self.db_path.endswith(GZIP_SUFFIX)) as f:
+            write_json(f, data, indent=False)
+        os.replace(tmp_path, self.db_path)
+        # db_path now holds every item, so the journal can go
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._loaded_stamp = self._file_stamp()
+
+    def _append(self, records):
+        if records:
+            with open(self.journal_path, "ab") as f:
+                for record in records:
+                    append_json_line(f, record)
+            self._loaded_stamp = self._file_stamp()
+
+    def _file_stamp(self):
+        """Modification times of db_path and the journal (None where missing)."""
+        return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else None
+                     for p in (self.db_path, self.journal_path))
+
+    def _merge_record(self, items, record, item_cls):
+        """Put record into items, reusing the current item object if it is unchanged."""
+        old = self.items.get(record["full_code"])
+        item = old if old is not None and old.to_dict() == record else item_cls.from_dict(record)
+        items[item.full_code] = item
+
+    def _replay_journal(self, items, item_cls):
+        """Apply journaled changes on top of the items just loaded from db_path."""
+        self._dirty.clear()
+        self._dirty_all = False
+        self._journaled = 0
+        if not os.path.exists(self.journal_path):
+            return
+        bad_lines = []
+        for record in iter_json_lines(self.journal_path, bad_lines):
+            if record.get("removed"):
+                items.pop(record.get("full_code"), None)
+            else:
+                self._merge_record(items, record, item_cls)
+            self._journaled += 1
+        if bad_lines:
+            # Appending after a damaged line would lose the next record with
+            # it; the next save rewrites db_path and drops the journal instead
+            warnings.warn(f"{self.journal_path}: skipped unreadable lines {bad_lines}")
+            self._dirty_all = True
+
+    def _swap_items(self, items):
+        """Install freshly loaded items; True if they differ from the current ones."""
+        changed = items.keys() != self.items.keys() or any(
+            item is not self.items[code] for code, item in items.items())
+        self.items = items
+        return changed
+
+
+def flush_saves(*models):
+    """
+    Write out the pending saves of models (None entries are skipped),
+    compacting their journals, and wait for them. GUIs call this before
+    destroying the Tk root whose event loop runs the debounced saves, and
+    before replacing their models with ones loaded from another project or a
+    reload. Every model is flushed even if one fails; the first error is
+    raised afterwards.
+    """
+    error = None
+    for model in models:
+        if model is not None:
+            try:
+                model.flush_save(compact=True)
+            except Exception as exc:
+                error = error or exc
+    if error is not None:
+        raise error
@@ -16,6 +16,9 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 
+from tree_utils import frozen_tree, insert_lazy_nodes, expand_lazy_node, batch_insert, new_row_id
+from background import run_in_background
+
 # Example: Proper imports from your existing modules
 # from system_model import SystemModel
 # from technology_model import TechnologyModel
@@ -50,6 +53,7 @@ class DigitalTwinVisualizer:
         self.tree_sys = ttk.Treeview(left, show="tree", height=28)
         self.tree_sys.pack(fill=tk.BOTH, expand=True, padx=3, pady=4)
         self.tree_sys.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self.tree_sys.bind("<<TreeviewOpen>>", self._on_tree_open)
         main.add(left, minsize=260)
 
         # Right split vertical for tech/connections
@@ -90,9 +94,22 @@ class DigitalTwinVisualizer:
         from system_model import SystemModel
         from technology_model import TechnologyModel
         from connections_gui import ConnectionManager
-        self.system_model = SystemModel(os.path.join(folder, "systems.json"))
-        self.tech_model = TechnologyModel(os.path.join(folder, "technologies.json"))
-        self.conn_manager = ConnectionManager(os.path.join(folder, "connections.json"))
+
+        def load_models():
+            # Runs on a worker thread: parse the JSON files and build the tree index
+            system_model = SystemModel(os.path.join(folder, "systems.json"))
+            system_model.children_by_parent()
+            return (system_model,
+                    TechnologyModel(os.path.join(folder, "technologies.json")),
+                    ConnectionManager(os.path.join(folder, "connections.json")))
+
+        self.lbl_proj.config(text=f"Loading {os.path.basename(folder)}...", fg="gray")
+        run_in_background(self.root, load_models, lambda models: self._apply_project(folder, models))
+
+    def _apply_project(self, folder, models):
+        if self.conn_manager is not None:
+            self.conn_manager.close()  # releases its files and drops its exit hook
+        self.system_model, self.tech_model, self.conn_manager = models
         self.project_folder = folder
         self.lbl_proj.config(text=f"Project: {os.path.basename(folder)}", fg="green")
         self.refresh_tree()
@@ -101,16 +118,13 @@ class DigitalTwinVisualizer:
         self.tree_sys.delete(*self.tree_sys.get_children())
         if not self.system_model:
             return
-        roots = [i for i in self.system_model.items.values() if i.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_node(root, "")
+        # Only roots are inserted; subtrees are filled in on <<TreeviewOpen>>
+        roots, self._sys_children = self.system_model.children_by_parent()
+        with frozen_tree(self.tree_sys):
+            insert_lazy_nodes(self.tree_sys, "", roots, self._sys_children)
 
-    def insert_node(self, item, parent):
-        node_id = self.tree_sys.insert(parent, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for child_code in item.children_codes:
-            child = self.system_model.get_item(child_code)
-            if child:
-                self.insert_node(child, node_id)
+    def _on_tree_open(self, event):
+        expand_lazy_node(self.tree_sys, self.tree_sys.focus(), self._sys_children)
 
     def on_tree_select(self, e):
         sel = self.tree_sys.selection()
@@ -118,31 +132,32 @@ class DigitalTwinVisualizer:
             self.tbl_tech.delete(*self.tbl_tech.get_children())
             self.tbl_conn.delete(*self.tbl_conn.get_children())
             return
-        code = self.tree_sys.item(sel[0], "text").split("|")[-1].strip()
+        code = self.tree_sys.item(sel[0], "values")[0]
         self.update_tech_table(code)
         self.update_conn_table(code)
 
     def update_tech_table(self, code):
-        self.tbl_tech.delete(*self.tbl_tech.get_children())
-        if not code or not self.tech_model or not self.system_model:
-            return
-        item = self.system_model.get_item(code)
-        if not item or not getattr(item, 'technology_refs', []):
-            return
-        for t_code in item.technology_refs:
+        rows = []
+        item = self.system_model.get_item(code) if code and self.tech_model and self.system_model else None
+        for t_code in sorted(getattr(item, 'technology_refs', ())):
             t = self.tech_model.get_item(t_code)
             name = t.name if t else "[MISSING]"
-            self.tbl_tech.insert("", "end", values=(name, t_code))
+            rows.append((name, t_code))
+        self.fill_table(self.tbl_tech, rows)
 
     def update_conn_table(self, code):
-        self.tbl_conn.delete(*self.tbl_conn.get_children())
-        if not code or not self.conn_manager:
-            return
-        for c in self.conn_manager.connections:
-            if c.source == code:
+        rows = []
+        if code and self.conn_manager:
+            for c in self.conn_manager.by_source.get(code, ()):
                 tgt = self.system_model.get_item(c.target) if hasattr(self.system_model, 'get_item') else None
                 tgt_name = f"{tgt.name} | {tgt.full_code}" if tgt else c.target
-                self.tbl_conn.insert("", "end", values=(tgt_name, getattr(c, 'type_label', getattr(c, 'type', '[?TYPE]')), getattr(c, 'description', getattr(c, 'desc', ''))))
+                rows.append((tgt_name, getattr(c, 'type_label', getattr(c, 'type', '[?TYPE]')), getattr(c, 'description', getattr(c, 'desc', ''))))
+        self.fill_table(self.tbl_conn, rows)
+
+    def fill_table(self, table, rows):
+        # Old rows go in one delete and the new ones in one batch, not a Tk round trip per row
+        table.delete(*table.get_children())
+        batch_insert(table, [("", new_row_id(), "", values, ()) for values in rows])
 
 if __name__ == "__main__":
     root = tk.Tk()
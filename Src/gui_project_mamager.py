@@ -4,6 +4,7 @@ import os
 
 from system_model import SystemModel
 from technology_model import TechnologyModel
+from tree_utils import frozen_tree, insert_lazy_nodes, expand_lazy_node
 
 class ProjectManagerGUI:
     def __init__(self, root):
@@ -82,41 +83,35 @@ class ProjectManagerGUI:
         tk.Label(left_panel, text="SYSTEM TREE").pack()
         self.sys_tree = ttk.Treeview(left_panel, height=30)
         self.sys_tree.pack(fill=tk.BOTH, expand=True)
+        self.sys_tree.bind("<<TreeviewOpen>>", self._on_sys_tree_open)
         self.populate_system_tree()
 
         # = Technology Summary Tree =
         tk.Label(right_panel, text="TECHNOLOGIES").pack()
         self.tech_tree = ttk.Treeview(right_panel, height=30)
         self.tech_tree.pack(fill=tk.BOTH, expand=True)
+        self.tech_tree.bind("<<TreeviewOpen>>", self._on_tech_tree_open)
         self.populate_technology_tree()
 
     def populate_system_tree(self):
         self.sys_tree.delete(*self.sys_tree.get_children())
-        roots = [i for i in self.system_model.items.values() if i.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_system_node(root, "")
-
-    def insert_system_node(self, item, parent):
-        node_id = self.sys_tree.insert(parent, "end",
-            text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for child_code in item.children_codes:
-            child = self.system_model.get_item(child_code)
-            if child:
-                self.insert_system_node(child, node_id)
+        # Only roots are inserted; subtrees are filled in on <<TreeviewOpen>>
+        roots, self._sys_children = self.system_model.children_by_parent()
+        with frozen_tree(self.sys_tree):
+            insert_lazy_nodes(self.sys_tree, "", roots, self._sys_children)
+
+    def _on_sys_tree_open(self, event):
+        expand_lazy_node(self.sys_tree, self.sys_tree.focus(), self._sys_children)
 
     def populate_technology_tree(self):
         self.tech_tree.delete(*self.tech_tree.get_children())
-        roots = [i for i in self.technology_model.items.values() if i.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_technology_node(root, "")
-
-    def insert_technology_node(self, item, parent):
-        node_id = self.tech_tree.insert(parent, "end",
-            text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for child_code in item.children_codes:
-            child = self.technology_model.get_item(child_code)
-            if child:
-                self.insert_technology_node(child, node_id)
+        # Only roots are inserted; subtrees are filled in on <<TreeviewOpen>>
+        roots, self._tech_children = self.technology_model.children_by_parent()
+        with frozen_tree(self.tech_tree):
+            insert_lazy_nodes(self.tech_tree, "", roots, self._tech_children)
+
+    def _on_tech_tree_open(self, event):
+        expand_lazy_node(self.tech_tree, self.tech_tree.focus(), self._tech_children)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -9,96 +9,37 @@ Saves connections to <project_folder>/connections.json.
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
-import json
-import uuid
-
-# ✅ Standard connection types
-CONNECTION_TYPES = [
-    ("Mechanical", "MECH"),
-    ("Electrical", "ELEC"),
-    ("Magnetic", "MAGN"),
-    ("Data", "DATA"),
-    ("Logical", "LOGI"),
-    ("Hydraulic", "HYDR"),
-    ("Pneumatic", "PNUM"),
-    ("Spring", "SPRG"),
-    ("Ground", "GRND"),
-    ("RF", "RF___"),
-    ("Flexible", "FLEX"),
-    ("String", "STRN"),
-    ("Cable", "CABL"),
-    ("Custom...", "CUST")
-]
-
-# ✅ Basic data model
-class Connection:
-    def __init__(self, source, conn_type_id, conn_type_label, target, description=""):
-        self.uuid = str(uuid.uuid4())
-        self.source = source
-        self.type_id = conn_type_id
-        self.type_label = conn_type_label
-        self.target = target
-        self.description = description
-
-    def to_dict(self):
-        return {
-            "uuid": self.uuid,
-            "source": self.source,
-            "type_id": self.type_id,
-            "type_label": self.type_label,
-            "target": self.target,
-            "description": self.description
-        }
-
-class ConnectionManager:
-    def __init__(self, save_path):
-        self.save_path = save_path
-        self.connections = []
-        self.load()
-
-    def add_connection(self, conn: Connection):
-        self.connections.append(conn)
-        self.save()
-
-    def save(self):
-        with open(self.save_path, "w") as f:
-            json.dump([c.to_dict() for c in self.connections], f, indent=2)
-
-    def load(self):
-        self.connections.clear()
-        if os.path.exists(self.save_path):
-            with open(self.save_path, "r") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict):
-                            conn = Connection(
-                                item["source"], item["type_id"], item["type_label"],
-                                item["target"], item.get("description", "")
-                            )
-                            conn.uuid = item.get("uuid", str(uuid.uuid4()))
-                            self.connections.append(conn)
-
-# ✅ GUI class
+
+# Shared data model and connection type lookups
+from connections_gui import CONNECTION_LABELS, CONNECTION_TYPE_IDS, Connection, ConnectionManager
+from tree_utils import fill_rows
+
 class ConnectionGUI:
+    REFRESH_DELAY_MS = 50
+
     def __init__(self, root, system_elements, save_folder):
         self.root = root
+        self._refresh_pending = None
         self.system_elements = system_elements
         self.save_path = os.path.join(save_folder, "connections.json")
         self.manager = ConnectionManager(self.save_path)
+        # Option strings are built once and shared by both element comboboxes,
+        # along with a display -> code map for reading selections back
+        self._code_by_display = self._element_codes()
+        self._element_cache = list(self._code_by_display)
 
         tk.Label(root, text="Source Element").grid(row=0, column=0, sticky="e", padx=4)
-        self.src_cb = ttk.Combobox(root, values=self._element_list(), width=42)
+        self.src_cb = ttk.Combobox(root, values=self._element_cache, width=42)
         self.src_cb.grid(row=0, column=1, padx=4)
-        self.src_cb.bind("<<ComboboxSelected>>", lambda e: self.refresh_table())
+        self.src_cb.bind("<<ComboboxSelected>>", lambda e: self._schedule_refresh())
 
         tk.Label(root, text="Target Element").grid(row=1, column=0, sticky="e", padx=4)
-        self.tgt_cb = ttk.Combobox(root, values=self._element_list(), width=42)
+        self.tgt_cb = ttk.Combobox(root, values=self._element_cache, width=42)
         self.tgt_cb.grid(row=1, column=1, padx=4)
-        self.tgt_cb.bind("<<ComboboxSelected>>", lambda e: self.refresh_table())
+        self.tgt_cb.bind("<<ComboboxSelected>>", lambda e: self._schedule_refresh())
 
         tk.Label(root, text="Connection Type").grid(row=2, column=0, sticky="e", padx=4)
-        self.conn_cb = ttk.Combobox(root, values=[label for label, _ in CONNECTION_TYPES], state="readonly", width=42)
+        self.conn_cb = ttk.Combobox(root, values=CONNECTION_LABELS, state="readonly", width=42)
         self.conn_cb.set("Mechanical")
         self.conn_cb.grid(row=2, column=1, padx=4)
         self.conn_cb.bind("<<ComboboxSelected>>", self.on_conn_type_change)
@@ -122,10 +63,16 @@ class ConnectionGUI:
         self.conn_table.heading("target", text="Target")
         self.conn_table.heading("desc", text="Description")
         self.conn_table.grid(row=6, column=1, padx=4, pady=5)
+        self._conn_row_ids = []  # pooled table item ids, reused across refreshes
 
     # ✅ Build input options
-    def _element_list(self):
-        return [f"{e['name']} | {e['full_code']}" for e in self.system_elements]
+    def _element_codes(self):
+        return {f"{e['name']} | {e['full_code']}": e['full_code'] for e in self.system_elements}
+
+    def _code_of(self, display):
+        # Cached lookup; typed-in text falls back to parsing "name | code"
+        code = self._code_by_display.get(display)
+        return code if code is not None else display.split("|")[-1].strip()
 
     def on_conn_type_change(self, event):
         if self.conn_cb.get() == "Custom...":
@@ -143,10 +90,10 @@ class ConnectionGUI:
             messagebox.showerror("Error", "Cannot connect element to itself.")
             return
 
-        source_code = self.src_cb.get().split("|")[-1].strip()
-        target_code = self.tgt_cb.get().split("|")[-1].strip()
+        source_code = self._code_of(self.src_cb.get())
+        target_code = self._code_of(self.tgt_cb.get())
         type_label = self.conn_cb.get()
-        type_id = dict(CONNECTION_TYPES).get(type_label, "CUST")
+        type_id = CONNECTION_TYPE_IDS.get(type_label, "CUST")
 
         if type_label == "Custom...":
             type_label = self.custom_entry.get().strip()
@@ -164,25 +111,30 @@ class ConnectionGUI:
         self.conn_cb.set("Mechanical")
         self.refresh_table()
 
+    # Combobox events can arrive in bursts; coalesce them into one refresh
+    def _schedule_refresh(self):
+        if self._refresh_pending is not None:
+            self.root.after_cancel(self._refresh_pending)
+        self._refresh_pending = self.root.after(self.REFRESH_DELAY_MS, self._do_refresh)
+
+    def _do_refresh(self):
+        self._refresh_pending = None
+        self.refresh_table()
+
     def refresh_table(self):
-        self.conn_table.delete(*self.conn_table.get_children())
         selected_src = self.src_cb.get()
         selected_tgt = self.tgt_cb.get()
 
-        src_code = selected_src.split("|")[-1].strip() if selected_src else None
-        tgt_code = selected_tgt.split("|")[-1].strip() if selected_tgt else None
-
-        for c in self.manager.connections:
-            match = (
-                (src_code and c.source == src_code) or
-                (tgt_code and c.target == tgt_code) or
-                (src_code == c.source and tgt_code == c.target)
-            )
-            if match:
-                self.conn_table.insert(
-                    "", tk.END,
-                    values=(c.source, c.type_label, c.target, c.description)
-                )
+        src_code = self._code_of(selected_src) if selected_src else None
+        tgt_code = self._code_of(selected_tgt) if selected_tgt else None
+
+        # Connections leaving the source or entering the target, via the manager's indexes
+        rows = list(self.manager.by_source.get(src_code, ())) if src_code else []
+        if tgt_code:
+            rows += [c for c in self.manager.by_target.get(tgt_code, ()) if c.source != src_code]
+        # Row tuples are built before touching the widget; fill_rows reuses the pooled table rows
+        matches = [(c.source, c.type_label, c.target, c.description) for c in rows]
+        fill_rows(self.conn_table, self._conn_row_ids, matches)
 
 # 🔧 Entry point
 if __name__ == "__main__":
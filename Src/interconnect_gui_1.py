@@ -1,71 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
-import json
-import uuid
-
-# Standard connection types
-CONNECTION_TYPES = [
-    ("Mechanical", "MECH"),
-    ("Electrical", "ELEC"),
-    ("Magnetic", "MAGN"),
-    ("Data", "DATA"),
-    ("Logical", "LOGI"),
-    ("Hydraulic", "HYDR"),
-    ("Pneumatic", "PNUM"),
-    ("Spring", "SPRG"),
-    ("Ground", "GRND"),
-    ("RF", "RF___"),
-    ("Flexible", "FLEX"),
-    ("String", "STRN"),
-    ("Cable", "CABL"),
-    ("Custom...", "CUST")
-]
-
-class Connection:
-    def __init__(self, source, conn_type_id, conn_type_label, target, description=""):
-        self.uuid = str(uuid.uuid4())
-        self.source = source
-        self.type_id = conn_type_id
-        self.type_label = conn_type_label
-        self.target = target
-        self.description = description
-
-    def to_dict(self):
-        return {
-            "uuid": self.uuid,
-            "source": self.source,
-            "type_id": self.type_id,
-            "type_label": self.type_label,
-            "target": self.target,
-            "description": self.description
-        }
-
-class ConnectionManager:
-    def __init__(self, save_path):
-        self.save_path = save_path
-        self.connections = []
-        self.load()
-
-    def add_connection(self, conn: Connection):
-        self.connections.append(conn)
-        self.save()
-
-    def save(self):
-        with open(self.save_path, "w") as f:
-            json.dump([c.to_dict() for c in self.connections], f, indent=2)
-
-    def load(self):
-        if os.path.exists(self.save_path):
-            with open(self.save_path, "r") as f:
-                data = json.load(f)
-                for item in data:
-                    c = Connection(
-                        item["source"], item["type_id"], item["type_label"],
-                        item["target"], item.get("description", "")
-                    )
-                    c.uuid = item["uuid"]
-                    self.connections.append(c)
+
+# Shared data model and connection type lookups
+from connections_gui import CONNECTION_LABELS, CONNECTION_TYPE_IDS, Connection, ConnectionManager
 
 class ConnectionGUI:
     def __init__(self, root, system_elements, save_folder):
@@ -73,17 +11,21 @@ class ConnectionGUI:
         self.system_elements = system_elements
         self.save_path = os.path.join(save_folder, "connections.json")
         self.manager = ConnectionManager(self.save_path)
+        # Option strings are built once and shared by both element comboboxes,
+        # along with a display -> code map for reading selections back
+        self._code_by_display = self._element_codes()
+        self._element_cache = list(self._code_by_display)
 
         tk.Label(root, text="Source Element").grid(row=0, column=0, sticky="e")
-        self.src_cb = ttk.Combobox(root, values=self._element_list(), width=42)
+        self.src_cb = ttk.Combobox(root, values=self._element_cache, width=42)
         self.src_cb.grid(row=0, column=1)
 
         tk.Label(root, text="Target Element").grid(row=1, column=0, sticky="e")
-        self.tgt_cb = ttk.Combobox(root, values=self._element_list(), width=42)
+        self.tgt_cb = ttk.Combobox(root, values=self._element_cache, width=42)
         self.tgt_cb.grid(row=1, column=1)
 
         tk.Label(root, text="Connection Type").grid(row=2, column=0, sticky="e")
-        self.conn_cb = ttk.Combobox(root, values=[label for label, _ in CONNECTION_TYPES], state="readonly", width=42)
+        self.conn_cb = ttk.Combobox(root, values=CONNECTION_LABELS, state="readonly", width=42)
         self.conn_cb.set("Mechanical")
         self.conn_cb.grid(row=2, column=1)
 
@@ -98,8 +40,13 @@ class ConnectionGUI:
         self.status = tk.Label(root, text="", fg="green")
         self.status.grid(row=6, column=0, columnspan=2)
 
-    def _element_list(self):
-        return [f"{e['name']} | {e['full_code']}" for e in self.system_elements]
+    def _element_codes(self):
+        return {f"{e['name']} | {e['full_code']}": e['full_code'] for e in self.system_elements}
+
+    def _code_of(self, display):
+        # Cached lookup; typed-in text falls back to parsing "name | code"
+        code = self._code_by_display.get(display)
+        return code if code is not None else display.split("|")[-1].strip()
 
     def _conn_type_selected(self, event=None):
         if self.conn_cb.get() == "Custom...":
@@ -115,10 +62,10 @@ class ConnectionGUI:
             messagebox.showerror("Error", "Cannot connect element to itself.")
             return
 
-        source_code = self.src_cb.get().split("|")[-1].strip()
-        target_code = self.tgt_cb.get().split("|")[-1].strip()
+        source_code = self._code_of(self.src_cb.get())
+        target_code = self._code_of(self.tgt_cb.get())
         type_label = self.conn_cb.get()
-        type_id = dict(CONNECTION_TYPES).get(type_label, "CUST")
+        type_id = CONNECTION_TYPE_IDS.get(type_label, "CUST")
 
         if type_label == "Custom...":
             custom_label = self.custom_type_entry.get().strip()
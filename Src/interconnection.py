@@ -6,14 +6,20 @@ Each connection element can be part of a hierarchy (with parent, children, attri
 This module provides the ConnectionElement and ConnectionStack classes.
 """
 
-import uuid
-import json
+import sys
 from typing import Dict, List, Optional, Any
 
+from json_io import iter_json_items, dump_json
+from uuid_pool import new_uuid
+
 class ConnectionElement:
     """
     Represents a single, reusable type of connection—can be hierarchical and have its own attributes.
     """
+    __slots__ = ("uuid", "name", "description", "hierarchy_digits", "sibling_digits",
+                 "level_index", "sibling_index", "_code", "parent_code", "_full_code",
+                 "attributes", "children_codes")
+
     def __init__(
         self,
         name: str,
@@ -25,25 +31,39 @@ class ConnectionElement:
         sibling_index: int = 1,
         attributes: Optional[Dict[str, Any]] = None
     ):
-        self.uuid = str(uuid.uuid4())
+        self.uuid = new_uuid()
         self.name = name
         self.description = description
         self.hierarchy_digits = hierarchy_digits
         self.sibling_digits = sibling_digits
         self.level_index = level_index
         self.sibling_index = sibling_index
-        self.code = self.generate_code(level_index, sibling_index)
-        self.parent_code = (parent_code[-(hierarchy_digits + sibling_digits):]
+        # code/full_code are built on first access (see the properties below)
+        self._code = None
+        self._full_code = None
+        # Siblings share their parent's code: keep one copy of each
+        self.parent_code = sys.intern(parent_code[-(hierarchy_digits + sibling_digits):]
             if parent_code and len(parent_code) >= (hierarchy_digits + sibling_digits)
             else "0" * (hierarchy_digits + sibling_digits)
         )
-        self.full_code = self.parent_code + self.code
         self.attributes = attributes or {}
         self.children_codes: List[str] = []
 
     def generate_code(self, level: int, sibling: int) -> str:
         return str(level).zfill(self.hierarchy_digits) + str(sibling).zfill(self.sibling_digits)
 
+    @property
+    def code(self) -> str:
+        if self._code is None:
+            self._code = self.generate_code(self.level_index, self.sibling_index)
+        return self._code
+
+    @property
+    def full_code(self) -> str:
+        if self._full_code is None:
+            self._full_code = self.parent_code + self.code
+        return self._full_code
+
     def add_child(self, child: 'ConnectionElement') -> None:
         self.children_codes.append(child.full_code)
 
@@ -66,17 +86,23 @@ class ConnectionElement:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ConnectionElement':
+        # Digit counts are stored as JSON numbers, so they need no int() coercion
+        hd = data.get("hierarchy_digits", 2)
+        code = data["code"]
         obj = cls(
             name=data["name"],
             description=data.get("description", ""),
             parent_code=data.get("parent_code"),
-            hierarchy_digits=int(data.get("hierarchy_digits", 2)),
-            sibling_digits=int(data.get("sibling_digits", 2)),
-            level_index=int(data["code"][:int(data.get("hierarchy_digits", 2))]),
-            sibling_index=int(data["code"][int(data.get("hierarchy_digits", 2)):]),
-            attributes=data.get("attributes", {})
+            hierarchy_digits=hd,
+            sibling_digits=data.get("sibling_digits", 2),
+            level_index=int(code[:hd]),
+            sibling_index=int(code[hd:]),
+            # The same few attribute names recur on every element
+            attributes={sys.intern(k): v for k, v in data["attributes"].items()} if data.get("attributes") else {}
         )
-        obj.uuid = data.get("uuid", str(uuid.uuid4()))
+        obj._code = code  # already formatted on disk
+        if "uuid" in data:
+            obj.uuid = data["uuid"]
         obj.children_codes = data.get("children_codes", [])
         return obj
 
@@ -97,16 +123,13 @@ class ConnectionStack:
         return {code: elem.to_dict() for code, elem in self.elements.items()}
 
     def save(self, path: str):
-        with open(path, "w") as f:
-            json.dump(self.to_dict(), f, indent=2)
+        dump_json(path, self.to_dict())
 
     def load(self, path: str):
         self.elements.clear()
-        with open(path, "r") as f:
-            data = json.load(f)
-            for _, elem_data in data.items():
-                element = ConnectionElement.from_dict(elem_data)
-                self.elements[element.full_code] = element
+        for _, elem_data in iter_json_items(path):
+            element = ConnectionElement.from_dict(elem_data)
+            self.elements[element.full_code] = element
 
 # --- Example usage ---
 if __name__ == "__main__":
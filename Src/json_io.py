@@ -0,0 +1,137 @@
+"""
+json_io.py
+
+JSON read/write helpers shared by the models.
+orjson and ijson are optional speedups; the stdlib json module is used when they are not installed.
+Paths ending in ".gz" are read and written gzip-compressed (JSON-lines files excepted).
+"""
+
+import gzip
+import json
+import mmap
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Files above this size are parsed item by item (when ijson is available).
+# ijson's C backend streams at close to whole-file speed, so with it much
+# smaller files are streamed too and never held in memory all at once.
+STREAM_THRESHOLD = 100 * 1024 * 1024
+if ijson and ijson.backend == "yajl2_c":
+    STREAM_THRESHOLD = 8 * 1024 * 1024
+
+
+# Compressed files trade load-time CPU for size: worth it when I/O is the
+# bottleneck (network drives, very large models), not on a local SSD
+GZIP_SUFFIX = ".gz"
+GZIP_LEVEL = 1
+
+
+def open_json(path, mode="rb", compressed=None):
+    """
+    Open path in binary mode ("rb" or "wb"), through gzip when compressed is
+    true or, by default, when path ends in GZIP_SUFFIX.
+    """
+    if compressed is None:
+        compressed = path.endswith(GZIP_SUFFIX)
+    if compressed:
+        return gzip.open(path, mode, compresslevel=GZIP_LEVEL) if "w" in mode else gzip.open(path, mode)
+    return open(path, mode)
+
+
+def _parse_file(f):
+    """
+    Parse an open binary file in one go. orjson reads a plain file through a
+    read-only mmap, so the raw text is never copied into a bytes object
+    alongside the parsed data.
+    """
+    if not orjson:
+        return json.load(f)
+    if isinstance(f, gzip.GzipFile):
+        return orjson.loads(f.read())  # its fileno() is the compressed file
+    if os.fstat(f.fileno()).st_size == 0:
+        return orjson.loads(f.read())  # an empty file cannot be mapped
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+        return orjson.loads(view)
+
+
+def load_json(path):
+    """Parse a whole JSON file."""
+    with open_json(path) as f:
+        return _parse_file(f)
+
+
+def iter_json_list(path):
+    """Yield the entries of a JSON file whose top level is a list."""
+    with open_json(path) as f:
+        if ijson and os.path.getsize(path) > STREAM_THRESHOLD:
+            yield from ijson.items(f, "item")
+            return
+        data = _parse_file(f)
+    if isinstance(data, list):
+        yield from data
+
+
+def iter_json_items(path):
+    """Yield the (key, value) pairs of a JSON file whose top level is an object."""
+    with open_json(path) as f:
+        if ijson and os.path.getsize(path) > STREAM_THRESHOLD:
+            yield from ijson.kvitems(f, "")
+            return
+        data = _parse_file(f)
+    if isinstance(data, dict):
+        yield from data.items()
+
+
+def iter_json_lines(path, bad_lines=None):
+    """
+    Yield one parsed record per line of a JSON-lines file. Lines that do not
+    parse (e.g. torn by an interrupted append, wherever later appends left
+    them) are skipped, and their 1-based numbers are added to bad_lines when
+    it is a list.
+    """
+    loads = orjson.loads if orjson else json.loads
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = loads(line)
+            except ValueError:
+                if bad_lines is not None:
+                    bad_lines.append(number)
+                continue
+            yield record
+
+
+def append_json_line(f, obj, default=None):
+    """Write obj as one compact JSON line to a file opened in binary append mode."""
+    if orjson:
+        f.write(orjson.dumps(obj, default=default, option=orjson.OPT_APPEND_NEWLINE))
+    else:
+        f.write(json.dumps(obj, separators=(",", ":"), default=default).encode() + b"\n")
+
+
+def write_json(f, data, indent=True, default=None):
+    """
+    Write data as JSON to a file opened in binary mode, indented by default.
+    orjson serializes dataclasses itself; default is the fallback for other objects.
+    """
+    if orjson:
+        f.write(orjson.dumps(data, default=default, option=orjson.OPT_INDENT_2 if indent else 0))
+    else:
+        f.write(json.dumps(data, indent=2 if indent else None, default=default).encode())
+
+
+def dump_json(path, data, indent=True, default=None):
+    """Write data to path as JSON (see write_json)."""
+    with open_json(path, "wb") as f:
+        write_json(f, data, indent, default)
@@ -17,20 +17,26 @@ import os
 
 from system_model import SystemModel
 from technology_model import TechnologyModel
+from tree_utils import fill_rows, sync_tree
 # Use your CONNECTION_TYPES, Connection and ConnectionManager from previous answers
-from connections_gui import CONNECTION_TYPES, ConnectionManager, Connection
+from connections_gui import CONNECTION_LABELS, CONNECTION_TYPE_IDS, ConnectionManager, Connection
 
 class ManagerGUI:
+    REFRESH_DELAY_MS = 50
+
     def __init__(self, root):
         self.root = root
+        self._refresh_pending = None
         self.root.title("Unified Digital Twin Manager")
         self.project_path = None
         self.system_model = None
         self.technology_model = None
         self.connection_manager = None
         self.selected_sys_code = None
+        self._dirty = set()  # panes whose refresh was skipped while they were hidden
 
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_ui(self):
         top = tk.Frame(self.root)
@@ -45,6 +51,11 @@ class ManagerGUI:
 
         ttk.Label(self.work_frame, text="Create or open a project to start modeling.", foreground="gray").pack(pady=20)
 
+    def on_close(self):
+        if self.connection_manager:
+            self.connection_manager.close()
+        self.root.destroy()
+
     def open_project(self):
         folder = filedialog.askdirectory(title="Open project folder")
         if not folder:
@@ -72,6 +83,8 @@ class ManagerGUI:
         self.load_project(project_path)
 
     def load_project(self, path):
+        if self.connection_manager:
+            self.connection_manager.close()
         self.project_path = path
         self.system_model = SystemModel(os.path.join(path, "systems.json"))
         self.technology_model = TechnologyModel(os.path.join(path, "technologies.json"))
@@ -94,21 +107,29 @@ class ManagerGUI:
         tk.Label(sys_frame, text="Systems").pack()
         self.sys_tree = ttk.Treeview(sys_frame, height=18)
         self.sys_tree.pack(fill=tk.BOTH, expand=True)
+        self.sys_tree.bind("<Map>", lambda e: self._refresh_if_dirty("sys", self.refresh_system_tree))
+        self._sys_node_ids = {}  # (parent iid, full_code) -> (iid, text) of rows in sys_tree
         self.refresh_system_tree()
 
         # TECHNOLOGY TREE (center left)
         tk.Label(tech_frame, text="Technologies").pack()
         self.tech_tree = ttk.Treeview(tech_frame, height=18)
         self.tech_tree.pack(fill=tk.BOTH, expand=True)
+        self.tech_tree.bind("<Map>", lambda e: self._refresh_if_dirty("tech", self.refresh_technology_tree))
+        self._tech_node_ids = {}  # (parent iid, full_code) -> (iid, text) of rows in tech_tree
         self.refresh_technology_tree()
 
         # CONNECTIONS & LINKING
         tk.Label(conn_frame, text="Connect Elements").pack()
-        self.src_cb = ttk.Combobox(conn_frame, values=self._system_elem_list(), width=36)
+        # Option strings are built once per render and shared by both element comboboxes,
+        # along with a display -> code map for reading selections back
+        self._code_by_display = self._system_elem_codes()
+        self._element_cache = list(self._code_by_display)
+        self.src_cb = ttk.Combobox(conn_frame, values=self._element_cache, width=36)
         self.src_cb.pack(pady=4)
-        self.tgt_cb = ttk.Combobox(conn_frame, values=self._system_elem_list(), width=36)
+        self.tgt_cb = ttk.Combobox(conn_frame, values=self._element_cache, width=36)
         self.tgt_cb.pack(pady=4)
-        self.conn_cb = ttk.Combobox(conn_frame, values=[lbl for lbl, _ in CONNECTION_TYPES], state="readonly", width=36)
+        self.conn_cb = ttk.Combobox(conn_frame, values=CONNECTION_LABELS, state="readonly", width=36)
         self.conn_cb.set("Mechanical")
         self.conn_cb.pack(pady=4)
         self.conn_cb.bind("<<ComboboxSelected>>", self._handle_custom_entry)
@@ -126,38 +147,47 @@ class ManagerGUI:
         for col in ("source", "type", "target", "desc"):
             self.conn_table.heading(col, text=col.capitalize())
         self.conn_table.pack(pady=6)
-        self.src_cb.bind("<<ComboboxSelected>>", lambda e: self.refresh_conn_table())
-        self.tgt_cb.bind("<<ComboboxSelected>>", lambda e: self.refresh_conn_table())
+        self._conn_row_ids = []  # pooled table item ids, reused across refreshes
+        self.conn_table.bind("<Map>", lambda e: self._refresh_if_dirty("conn", self.refresh_conn_table))
+        self.src_cb.bind("<<ComboboxSelected>>", lambda e: self._schedule_refresh())
+        self.tgt_cb.bind("<<ComboboxSelected>>", lambda e: self._schedule_refresh())
         self.refresh_conn_table()
 
-    def _system_elem_list(self):
-        return [f"{i.name} | {i.full_code}" for i in self.system_model.items.values()]
+    def _system_elem_codes(self):
+        return {f"{i.name} | {i.full_code}": i.full_code for i in self.system_model.items.values()}
+
+    def _code_of(self, display):
+        # Cached lookup; typed-in text falls back to parsing "name | code"
+        code = self._code_by_display.get(display)
+        return code if code is not None else display.split("|")[-1].strip()
+
+    # Refreshes of hidden panes are skipped and left marked dirty; the pane's
+    # <Map> binding catches it up once, when it is actually shown.
+    def _refresh_if_dirty(self, pane, refresh):
+        if pane in self._dirty:
+            refresh()
 
+    def _pane_hidden(self, pane, widget):
+        # winfo_ismapped rather than winfo_viewable: it is already true while the
+        # pane's own <Map> event is handled, even if an ancestor maps after it
+        if not widget.winfo_ismapped():
+            self._dirty.add(pane)
+            return True
+        self._dirty.discard(pane)
+        return False
+
+    # Trees are synced against the model: only added, removed or renamed rows touch Tk
     def refresh_system_tree(self):
-        self.sys_tree.delete(*self.sys_tree.get_children())
-        roots = [i for i in self.system_model.items.values() if i.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self._insert_sys_node(root, "")
-
-    def _insert_sys_node(self, item, parent):
-        node_id = self.sys_tree.insert(parent, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for child_code in item.children_codes:
-            child = self.system_model.get_item(child_code)
-            if child:
-                self._insert_sys_node(child, node_id)
+        if self._pane_hidden("sys", self.sys_tree):
+            return
+        roots, children = self.system_model.children_by_parent()
+        sync_tree(self.sys_tree, roots, children, self._sys_node_ids)
 
     def refresh_technology_tree(self):
-        self.tech_tree.delete(*self.tech_tree.get_children())
-        roots = [j for j in self.technology_model.items.values() if j.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self._insert_tech_node(root, "")
-
-    def _insert_tech_node(self, item, parent):
-        node_id = self.tech_tree.insert(parent, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for child_code in item.children_codes:
-            child = self.technology_model.get_item(child_code)
-            if child:
-                self._insert_tech_node(child, node_id)
+        if self._pane_hidden("tech", self.tech_tree):
+            return
+        roots, children = self.technology_model.children_by_parent()
+        sync_tree(self.tech_tree, roots, children, self._tech_node_ids)
 
     def _handle_custom_entry(self, event):
         if self.conn_cb.get() == "Custom...":
@@ -174,10 +204,10 @@ class ManagerGUI:
             return
 
         # Parse source/target codes
-        source_code = self.src_cb.get().split("|")[-1].strip()
-        target_code = self.tgt_cb.get().split("|")[-1].strip()
+        source_code = self._code_of(self.src_cb.get())
+        target_code = self._code_of(self.tgt_cb.get())
         type_label = self.conn_cb.get()
-        type_id = dict(CONNECTION_TYPES).get(type_label, "CUST")
+        type_id = CONNECTION_TYPE_IDS.get(type_label, "CUST")
         if type_label == "Custom...":
             custom_label = self.custom_conn_entry.get().strip()
             if not custom_label:
@@ -193,23 +223,35 @@ class ManagerGUI:
         self.refresh_conn_table()
         self.conn_desc.delete(0, tk.END)
 
+    # Combobox events can arrive in bursts; coalesce them into one refresh
+    def _schedule_refresh(self):
+        if self._refresh_pending is not None:
+            self.root.after_cancel(self._refresh_pending)
+        self._refresh_pending = self.root.after(self.REFRESH_DELAY_MS, self._do_refresh)
+
+    def _do_refresh(self):
+        self._refresh_pending = None
+        self.refresh_conn_table()
+
     def refresh_conn_table(self):
-        self.conn_table.delete(*self.conn_table.get_children())
+        if self._pane_hidden("conn", self.conn_table):
+            return
         selected_src = self.src_cb.get()
         selected_tgt = self.tgt_cb.get()
-        src_code = selected_src.split("|")[-1].strip() if selected_src else None
-        tgt_code = selected_tgt.split("|")[-1].strip() if selected_tgt else None
-
-        for c in self.connection_manager.connections:
-            show = False
-            if src_code and tgt_code:
-                show = (c.source == src_code and c.target == tgt_code)
-            elif src_code:
-                show = c.source == src_code
-            elif tgt_code:
-                show = c.target == tgt_code
-            if show:
-                self.conn_table.insert("", tk.END, values=(c.source, c.type_label, c.target, c.description))
+        src_code = self._code_of(selected_src) if selected_src else None
+        tgt_code = self._code_of(selected_tgt) if selected_tgt else None
+
+        manager = self.connection_manager
+        if src_code and tgt_code:
+            rows = [c for c in manager.by_source.get(src_code, ()) if c.target == tgt_code]
+        elif src_code:
+            rows = manager.by_source.get(src_code, ())
+        elif tgt_code:
+            rows = manager.by_target.get(tgt_code, ())
+        else:
+            rows = ()
+        matches = [(c.source, c.type_label, c.target, c.description) for c in rows]
+        fill_rows(self.conn_table, self._conn_row_ids, matches)
 
 if __name__ == "__main__":
     root = tk.Tk()
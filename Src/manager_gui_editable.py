@@ -15,6 +15,9 @@ from tkinter import ttk, filedialog, messagebox, simpledialog
 import os
 from system_model import SystemModel
 from technology_model import TechnologyModel
+from tree_utils import frozen_tree, recycle_lazy_tree, expand_lazy_node
+from background import load_models_in_background
+from deferred_save import flush_saves
 
 class EditableManagerGUI:
     def __init__(self, root):
@@ -23,9 +26,18 @@ class EditableManagerGUI:
         self.project_path = None
         self.system_model = None
         self.technology_model = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.build_gui()
 
+    def on_close(self):
+        try:
+            flush_saves(self.system_model, self.technology_model)
+        except Exception as exc:
+            messagebox.showerror("Save Failed", f"Recent changes could not be saved:\n{exc}")
+        finally:
+            self.root.destroy()
+
     def build_gui(self):
         top = tk.Frame(self.root)
         top.pack(fill=tk.X, padx=8, pady=4)
@@ -66,9 +78,18 @@ class EditableManagerGUI:
         self.load_project(folder)
 
     def load_project(self, folder):
+        flush_saves(self.system_model, self.technology_model)
+        sys_path = os.path.join(folder, "systems.json")
+        tech_path = os.path.join(folder, "technologies.json")
+
+        self.project_label.config(text=f"Loading {os.path.basename(folder)}...")
+        load_models_in_background(self.root, (lambda: SystemModel(sys_path), lambda: TechnologyModel(tech_path)),
+                                  lambda models: self._apply_project(folder, models),
+                                  replaces=(self.system_model, self.technology_model))
+
+    def _apply_project(self, folder, models):
         self.project_path = folder
-        self.system_model = SystemModel(os.path.join(folder, "systems.json"))
-        self.technology_model = TechnologyModel(os.path.join(folder, "technologies.json"))
+        self.system_model, self.technology_model = models
         self.render_edit_interface()
         self.project_label.config(text=f"📂 Project: {os.path.basename(folder)}")
 
@@ -86,6 +107,7 @@ class EditableManagerGUI:
         self.tree_sys = ttk.Treeview(frame_l, height=22)
         self.tree_sys.pack(fill=tk.BOTH, expand=True)
         self.tree_sys.bind("<Double-1>", self.edit_system_item)
+        self.tree_sys.bind("<<TreeviewOpen>>", lambda e: self.on_tree_open(self.tree_sys, self.system_model, self._sys_nodes))
 
         tk.Button(frame_l, text="➕ Add System", command=self.add_system_item).pack(pady=5)
         tk.Button(frame_l, text="❌ Delete Selected", command=self.delete_system_item).pack()
@@ -94,30 +116,46 @@ class EditableManagerGUI:
         self.tree_tech = ttk.Treeview(frame_r, height=22)
         self.tree_tech.pack(fill=tk.BOTH, expand=True)
         self.tree_tech.bind("<Double-1>", self.edit_tech_item)
+        self.tree_tech.bind("<<TreeviewOpen>>", lambda e: self.on_tree_open(self.tree_tech, self.technology_model, self._tech_nodes))
 
         tk.Button(frame_r, text="➕ Add Technology", command=self.add_tech_item).pack(pady=5)
         tk.Button(frame_r, text="❌ Delete Selected", command=self.delete_tech_item).pack()
 
+        # Per tree: (parent iid, full_code) -> node id (of rows inserted so far), codes whose row text is
+        # stale, and the model generation the rows were last built from
+        self._sys_nodes, self._tech_nodes = {}, {}
+        self._sys_dirty, self._tech_dirty = set(), set()
+        self._seen_generation = {}
         self.refresh_trees()
 
     def refresh_trees(self):
-        self.tree_sys.delete(*self.tree_sys.get_children())
-        self.tree_tech.delete(*self.tree_tech.get_children())
-
-        roots = [i for i in self.system_model.items.values() if i.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_node(self.tree_sys, root, self.system_model)
-
-        roots = [i for i in self.technology_model.items.values() if i.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_node(self.tree_tech, root, self.technology_model)
+        self.refresh_tree(self.tree_sys, self.system_model, self._sys_nodes, self._sys_dirty)
+        self.refresh_tree(self.tree_tech, self.technology_model, self._tech_nodes, self._tech_dirty)
+
+    def refresh_tree(self, tree, model, node_ids, dirty):
+        """
+        If the model's hierarchy changed since the last refresh, reconcile the
+        tree with it, reusing the rows already there; otherwise just rewrite
+        the text of the rows marked dirty.
+        """
+        if self._seen_generation.get(tree) == model.tree_generation:
+            if dirty:
+                # An item can be listed under several rows (6-digit codes repeat)
+                for (_, code), node_id in node_ids.items():
+                    item = model.get_item(code) if code in dirty else None
+                    if item:
+                        tree.item(node_id, text=f"{item.name} | {item.full_code}")
+            dirty.clear()
+            return
+        dirty.clear()  # every realized row is relabelled below
+        # Subtrees not opened yet stay collapsed and are filled in on <<TreeviewOpen>>
+        roots, children = model.children_by_parent()
+        with frozen_tree(tree):
+            recycle_lazy_tree(tree, roots, children, node_ids)
+        self._seen_generation[tree] = model.tree_generation
 
-    def insert_node(self, tree, item, model, parent=""):
-        node_id = tree.insert(parent, "end", text=f"{item.name} | {item.full_code}")
-        for child_code in item.children_codes:
-            child = model.get_item(child_code)
-            if child:
-                self.insert_node(tree, child, model, parent=node_id)
+    def on_tree_open(self, tree, model, node_ids):
+        expand_lazy_node(tree, tree.focus(), model.children_by_parent()[1], node_ids)
 
     def add_system_item(self):
         name = simpledialog.askstring("New System Item", "Enter name:")
@@ -126,11 +164,10 @@ class EditableManagerGUI:
 
         sel = self.tree_sys.selection()
         if sel:
-            sel_code = self.tree_sys.item(sel[0], "text").split("|")[-1].strip()
+            sel_code = self.tree_sys.item(sel[0], "values")[0]
             parent_code = sel_code
 
         self.system_model.create_item(name=name, description=desc, parent_code=parent_code)
-        self.system_model.save()
         self.refresh_trees()
 
     def add_tech_item(self):
@@ -140,66 +177,90 @@ class EditableManagerGUI:
 
         sel = self.tree_tech.selection()
         if sel:
-            sel_code = self.tree_tech.item(sel[0], "text").split("|")[-1].strip()
+            sel_code = self.tree_tech.item(sel[0], "values")[0]
             parent_code = sel_code
 
         self.technology_model.create_item(name=name, description=desc, parent_code=parent_code)
-        self.technology_model.save()
         self.refresh_trees()
 
     def edit_system_item(self, event):
         sel = self.tree_sys.selection()
         if not sel:
             return
-        code = self.tree_sys.item(sel[0], "text").split("|")[-1].strip()
+        code = self.tree_sys.item(sel[0], "values")[0]
         item = self.system_model.get_item(code)
         if not item:
             return
         new_name = simpledialog.askstring("Edit Name", "Enter new name:", initialvalue=item.name)
         new_desc = simpledialog.askstring("Edit Description", "Enter new description:", initialvalue=item.description)
-        if new_name:
-            item.name = new_name
-        if new_desc is not None:
-            item.description = new_desc
-        self.system_model.save()
+        self.system_model.update_item(code, new_name or None, new_desc)
+        self._sys_dirty.add(code)
         self.refresh_trees()
 
     def edit_tech_item(self, event):
         sel = self.tree_tech.selection()
         if not sel:
             return
-        code = self.tree_tech.item(sel[0], "text").split("|")[-1].strip()
+        code = self.tree_tech.item(sel[0], "values")[0]
         item = self.technology_model.get_item(code)
         if not item:
             return
         new_name = simpledialog.askstring("Edit Name", "Enter new name:", initialvalue=item.name)
         new_desc = simpledialog.askstring("Edit Description", "Enter new description:", initialvalue=item.description)
-        if new_name:
-            item.name = new_name
-        if new_desc is not None:
-            item.description = new_desc
-        self.technology_model.save()
+        self.technology_model.update_item(code, new_name or None, new_desc)
+        self._tech_dirty.add(code)
         self.refresh_trees()
 
     def delete_system_item(self):
         sel = self.tree_sys.selection()
         if not sel:
             return
-        code = self.tree_sys.item(sel[0], "text").split("|")[-1].strip()
-        if messagebox.askyesno("Confirm", "Delete this system item (and children)?"):
-            self.system_model.items.pop(code, None)
-            self.system_model.save()
-            self.refresh_trees()
+        code = self.tree_sys.item(sel[0], "values")[0]
+        # The prompt is non-modal: bind the model now, so a project opened meanwhile is left alone
+        model = self.system_model
+
+        def delete():
+            model.remove_item(code)
+            model.schedule_save(code)
+            if model is self.system_model:
+                self.refresh_trees()
+        self.confirm("Confirm", "Delete this system item (and children)?", delete)
 
     def delete_tech_item(self):
         sel = self.tree_tech.selection()
         if not sel:
             return
-        code = self.tree_tech.item(sel[0], "text").split("|")[-1].strip()
-        if messagebox.askyesno("Confirm", "Delete this technology item (and children)?"):
-            self.technology_model.items.pop(code, None)
-            self.technology_model.save()
-            self.refresh_trees()
+        code = self.tree_tech.item(sel[0], "values")[0]
+        # The prompt is non-modal: bind the model now, so a project opened meanwhile is left alone
+        model = self.technology_model
+
+        def delete():
+            model.remove_item(code)
+            model.schedule_save(code)
+            if model is self.technology_model:
+                self.refresh_trees()
+        self.confirm("Confirm", "Delete this technology item (and children)?", delete)
+
+    def confirm(self, title, message, on_yes):
+        """
+        Non-modal Yes/No prompt: on_yes runs when Yes is clicked. Unlike
+        messagebox.askyesno it does not run a nested event loop, so scheduled
+        saves and other after() work keep going while it is open; on_yes must
+        not rely on state the user can change meanwhile (e.g. the open project).
+        """
+        dialog = tk.Toplevel(self.root)
+        dialog.title(title)
+        dialog.transient(self.root)
+        tk.Label(dialog, text=message, padx=16, pady=12).pack()
+        buttons = tk.Frame(dialog)
+        buttons.pack(pady=(0, 10))
+
+        def yes():
+            dialog.destroy()
+            on_yes()
+        tk.Button(buttons, text="Yes", width=8, command=yes).pack(side=tk.LEFT, padx=4)
+        tk.Button(buttons, text="No", width=8, command=dialog.destroy).pack(side=tk.LEFT, padx=4)
+        dialog.bind("<Escape>", lambda e: dialog.destroy())
 
 if __name__ == "__main__":
     root = tk.Tk()
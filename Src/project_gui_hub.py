@@ -4,6 +4,9 @@ import os
 
 from system_model import SystemModel
 from technology_model import TechnologyModel
+from tree_utils import frozen_tree, recycle_lazy_tree, expand_lazy_node, patch_listbox
+from background import load_models_in_background
+from deferred_save import flush_saves
 
 class UnifiedProjectGUI:
     def __init__(self, root):
@@ -13,9 +16,20 @@ class UnifiedProjectGUI:
         self.system_model = None
         self.technology_model = None
         self.selected_sys_code = None
+        self._listed_tech_codes = []
+        self._current_tech_rows = []  # text of each tech_listbox line
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.setup_ui()
 
+    def on_close(self):
+        try:
+            flush_saves(self.system_model, self.technology_model)
+        except Exception as exc:
+            messagebox.showerror("Save Failed", f"Recent changes could not be saved:\n{exc}")
+        finally:
+            self.root.destroy()
+
     def setup_ui(self):
         # Top controls
         top = tk.Frame(self.root)
@@ -57,9 +71,18 @@ class UnifiedProjectGUI:
         self.load_project(project_dir)
 
     def load_project(self, path):
+        flush_saves(self.system_model, self.technology_model)
+        sys_path = os.path.join(path, "systems.json")
+        tech_path = os.path.join(path, "technologies.json")
+
+        self.project_label.config(text=f"Loading {os.path.basename(path)}...", fg="gray")
+        load_models_in_background(self.root, (lambda: SystemModel(sys_path), lambda: TechnologyModel(tech_path)),
+                                  lambda models: self._apply_project(path, models),
+                                  replaces=(self.system_model, self.technology_model))
+
+    def _apply_project(self, path, models):
         self.project_path = path
-        self.system_model = SystemModel(os.path.join(path, "systems.json"))
-        self.technology_model = TechnologyModel(os.path.join(path, "technologies.json"))
+        self.system_model, self.technology_model = models
         self.project_label.config(text=f"📂 {os.path.basename(path)}", fg="green")
         self.render_view()
 
@@ -80,12 +103,17 @@ class UnifiedProjectGUI:
         self.sys_tree = ttk.Treeview(lf, height=26)
         self.sys_tree.pack(fill=tk.BOTH, expand=True)
         self.sys_tree.bind("<<TreeviewSelect>>", self.on_sys_select)
+        self.sys_tree.bind("<<TreeviewOpen>>", self._on_sys_tree_open)
+        # Model generation each tree was last populated from, and (parent iid, full_code) -> iid of its realized rows
+        self._sys_generation = self._tech_generation = None
+        self._sys_nodes, self._tech_nodes = {}, {}
         self.populate_system_tree()
 
         # Technology tree
         tk.Label(rf, text="TECHNOLOGIES").pack()
         self.tech_tree = ttk.Treeview(rf, height=26, selectmode='extended')
         self.tech_tree.pack(fill=tk.BOTH, expand=True)
+        self.tech_tree.bind("<<TreeviewOpen>>", self._on_tech_tree_open)
         self.populate_technology_tree()
 
         # Tech assignment panel
@@ -98,6 +126,7 @@ class UnifiedProjectGUI:
         tk.Label(pf, text="Technologies Assigned:").pack(pady=2)
         self.tech_listbox = tk.Listbox(pf, width=44)
         self.tech_listbox.pack(fill=tk.BOTH, expand=True, pady=1)
+        self._current_tech_rows = []
         self.unassign_btn = tk.Button(pf, text="Unassign Selected Technology", command=self.unassign_technology)
         self.unassign_btn.pack(pady=3)
 
@@ -109,47 +138,52 @@ class UnifiedProjectGUI:
 
     # ------ Core logic for trees and assignment ------
     def populate_system_tree(self):
-        self.sys_tree.delete(*self.sys_tree.get_children())
-        roots = [i for i in self.system_model.items.values() if i.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_sys_node(root, "")
-
-    def insert_sys_node(self, item, parent):
-        node_id = self.sys_tree.insert(parent, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for child_code in item.children_codes:
-            child = self.system_model.get_item(child_code)
-            if child:
-                self.insert_sys_node(child, node_id)
+        if self._sys_generation == self.system_model.tree_generation:
+            return  # hierarchy unchanged, rows are current
+        self._sys_generation = self.system_model.tree_generation
+        # Existing rows are reused; unopened subtrees are filled in on <<TreeviewOpen>>
+        roots, self._sys_children = self.system_model.children_by_parent()
+        with frozen_tree(self.sys_tree):
+            recycle_lazy_tree(self.sys_tree, roots, self._sys_children, self._sys_nodes)
+
+    def _on_sys_tree_open(self, event):
+        expand_lazy_node(self.sys_tree, self.sys_tree.focus(), self._sys_children, self._sys_nodes)
 
     def populate_technology_tree(self):
-        self.tech_tree.delete(*self.tech_tree.get_children())
-        roots = [j for j in self.technology_model.items.values() if j.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_tech_node(root, "")
-
-    def insert_tech_node(self, item, parent):
-        node_id = self.tech_tree.insert(parent, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for child_code in item.children_codes:
-            child = self.technology_model.get_item(child_code)
-            if child:
-                self.insert_tech_node(child, node_id)
+        if self._tech_generation == self.technology_model.tree_generation:
+            return  # hierarchy unchanged, rows are current
+        self._tech_generation = self.technology_model.tree_generation
+        # Existing rows are reused; unopened subtrees are filled in on <<TreeviewOpen>>
+        roots, self._tech_children = self.technology_model.children_by_parent()
+        with frozen_tree(self.tech_tree):
+            recycle_lazy_tree(self.tech_tree, roots, self._tech_children, self._tech_nodes)
+
+    def _on_tech_tree_open(self, event):
+        expand_lazy_node(self.tech_tree, self.tech_tree.focus(), self._tech_children, self._tech_nodes)
 
     def on_sys_select(self, event):
         sel = self.sys_tree.selection()
-        self.tech_listbox.delete(0, tk.END)
         if not sel:
             self.selected_sys_code = None
             self.sys_label.config(text="-")
+            self.show_assigned_techs([])
             return
         code = self.sys_tree.item(sel[0], "values")[0]
         self.selected_sys_code = code
         item = self.system_model.get_item(code)
         if item:
             self.sys_label.config(text=f"{item.name}\n({item.full_code})")
-            for tech_code in item.technology_refs:
-                tech = self.technology_model.get_item(tech_code)
-                tline = f"{tech.name} | {tech.full_code}" if tech else tech_code
-                self.tech_listbox.insert(tk.END, tline)
+        self.show_assigned_techs(sorted(item.technology_refs) if item else [])
+
+    def show_assigned_techs(self, tech_codes):
+        # Only the listbox lines that differ from what is shown are touched
+        get_tech = self.technology_model.get_item
+        rows = []
+        for tech_code in tech_codes:
+            tech = get_tech(tech_code)
+            rows.append(f"{tech.name} | {tech.full_code}" if tech else tech_code)
+        patch_listbox(self.tech_listbox, self._current_tech_rows, rows)
+        self._listed_tech_codes = list(tech_codes)  # tech code per listbox row
 
     def assign_technologies(self):
         if not self.selected_sys_code:
@@ -172,12 +206,8 @@ class UnifiedProjectGUI:
         if not sel:
             return
         idx = sel[0]
-        code_line = self.tech_listbox.get(idx)
-        tech_code = code_line.split("|")[-1].strip()
-        item = self.system_model.get_item(self.selected_sys_code)
-        if item and tech_code in item.technology_refs:
-            item.technology_refs.remove(tech_code)
-            self.system_model.save()
+        tech_code = self._listed_tech_codes[idx]
+        self.system_model.unassign_technology(self.selected_sys_code, tech_code)
         self.on_sys_select(None)
         self.status_popup("Unassigned and saved.")
 
@@ -191,7 +221,7 @@ class UnifiedProjectGUI:
         self.technology_model.load()
         self.populate_system_tree()
         self.populate_technology_tree()
-        self.tech_listbox.delete(0, tk.END)
+        self.show_assigned_techs([])
         self.sys_label.config(text="-")
         self.selected_sys_code = None
 
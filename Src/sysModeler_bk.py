@@ -1,82 +1,119 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 import uuid
-import json
 import os
 
+from json_io import dump_json, iter_json_list
+from tree_utils import PLACEHOLDER_TAG, frozen_tree, batch_insert, new_row_id
+
 # ───────────────────── Data Structures ─────────────────────
 
-class SystemAttribute:
-    def __init__(self, attr_type, description):
-        self.type = attr_type
-        self.description = description
-
-class Connection:
-    def __init__(self, target_id, conn_type, description):
-        self.target_id = target_id
-        self.conn_type = conn_type
-        self.description = description
+# Attributes are stored as {type: description} and connections as
+# (target_id, conn_type, description) tuples: both serialize as-is.
 
 class SystemItem:
     def __init__(self, name, description="", parent_id=None):
+        self._serialized_cache = None  # to_dict() result, dropped on any change
         self.id = str(uuid.uuid4())
         self.name = name
         self.description = description
         self.parent_id = parent_id
-        self.attributes = {}
-        self.connections = []
+        self.attributes = {}   # attr_type -> description
+        self.connections = []  # (target_id, conn_type, description)
+
+    # Field assignments go through __setattr__ so every change invalidates the cache
+    def __setattr__(self, key, value):
+        object.__setattr__(self, key, value)
+        if key != "_serialized_cache":
+            object.__setattr__(self, "_serialized_cache", None)
 
     def add_attribute(self, attr_type, description):
-        self.attributes[attr_type] = SystemAttribute(attr_type, description)
+        self.attributes[attr_type] = description
+        self._serialized_cache = None
 
     def add_connection(self, target, conn_type, description):
-        self.connections.append(Connection(target.id, conn_type, description))
+        self.connections.append((target.id, conn_type, description))
+        self._serialized_cache = None
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "parent_id": self.parent_id,
-            "attributes": {k: vars(v) for k, v in self.attributes.items()},
-            "connections": [vars(c) for c in self.connections]
-        }
+        if self._serialized_cache is None:
+            self._serialized_cache = {
+                "id": self.id,
+                "name": self.name,
+                "description": self.description,
+                "parent_id": self.parent_id,
+                "attributes": self.attributes,
+                "connections": self.connections
+            }
+        return self._serialized_cache
 
 class SystemModel:
     def __init__(self, db_path='system_model.json'):
         self.items = {}
+        self._by_name = {}  # name -> item, kept in step with items
         self.db_path = db_path
+        self.tree_generation = 0  # bumped when items are added or reloaded
+        self._tree_cache = None   # (roots, children by parent id); reset with tree_generation
         self.load()
 
     def create_item(self, name, description="", parent_id=None):
+        if name in self._by_name:
+            raise ValueError(f"An item named '{name}' already exists")
         item = SystemItem(name, description, parent_id)
         self.items[item.id] = item
+        self._by_name[name] = item
+        self.tree_generation += 1
+        self._tree_cache = None
         self.save()
         return item
 
     def get_item(self, item_id):
         return self.items.get(item_id)
 
+    def find_by_name(self, name):
+        return self._by_name.get(name)
+
+    def item_names(self):
+        return list(self._by_name)
+
+    def children_by_parent(self):
+        """Roots and children grouped by parent id, built once per structural change."""
+        if self._tree_cache is None:
+            roots, children = [], {}
+            for item in self.items.values():
+                if item.parent_id:
+                    children.setdefault(item.parent_id, []).append(item)
+                else:
+                    roots.append(item)
+            self._tree_cache = (roots, children)
+        return self._tree_cache
+
     def add_relationship(self, source, target, conn_type, description):
         source.add_connection(target, conn_type, description)
         self.save()
 
     def save(self):
-        with open(self.db_path, 'w') as f:
-            json.dump([item.to_dict() for item in self.items.values()], f, indent=2)
+        dump_json(self.db_path, [item.to_dict() for item in self.items.values()], indent=False)
 
     def load(self):
+        self.tree_generation += 1
+        self._tree_cache = None
         if os.path.exists(self.db_path):
-            with open(self.db_path, 'r') as f:
-                data = json.load(f)
-                for item_data in data:
-                    item = SystemItem(item_data['name'], item_data.get('description', ''), item_data.get('parent_id'))
-                    item.id = item_data['id']
-                    for k, v in item_data.get('attributes', {}).items():
+            for item_data in iter_json_list(self.db_path):
+                item = SystemItem(item_data['name'], item_data.get('description', ''), item_data.get('parent_id'))
+                item.id = item_data['id']
+                # Older files store each attribute/connection as a dict of its fields
+                for k, v in item_data.get('attributes', {}).items():
+                    if isinstance(v, dict):
                         item.add_attribute(v['type'], v['description'])
-                    for c in item_data.get('connections', []):
-                        item.connections.append(Connection(c['target_id'], c['conn_type'], c['description']))
-                    self.items[item.id] = item
+                    else:
+                        item.add_attribute(k, v)
+                for c in item_data.get('connections', []):
+                    if isinstance(c, dict):
+                        c = (c['target_id'], c['conn_type'], c['description'])
+                    item.connections.append(tuple(c))
+                self.items[item.id] = item
+                self._by_name.setdefault(item.name, item)  # first one wins, as the old scan did
 
 # ───────────────────── Tkinter UI ─────────────────────
 
@@ -88,6 +125,10 @@ class SystemModelUI:
         self.setup_ui()
 
     def setup_ui(self):
+        # One name list shared by the three item comboboxes, and the model
+        # generation it was taken from
+        names = self.get_item_names()
+        self._combo_generation = self.model.tree_generation
         # Left frame
         control_frame = tk.Frame(self.root)
         control_frame.pack(side=tk.LEFT, fill=tk.Y, padx=10, pady=10)
@@ -99,7 +140,7 @@ class SystemModelUI:
         self.desc_entry = tk.Entry(control_frame)
         self.desc_entry.pack()
         tk.Label(control_frame, text="Parent Item:").pack()
-        self.parent_cb = ttk.Combobox(control_frame, values=self.get_item_names())
+        self.parent_cb = ttk.Combobox(control_frame, values=names)
         self.parent_cb.pack()
         tk.Button(control_frame, text="Create Item", command=self.create_system_item).pack(pady=10)
 
@@ -112,10 +153,10 @@ class SystemModelUI:
 
         tk.Label(control_frame, text="Create Connection:").pack(pady=5)
         tk.Label(control_frame, text="From:").pack()
-        self.conn_from_cb = ttk.Combobox(control_frame, values=self.get_item_names())
+        self.conn_from_cb = ttk.Combobox(control_frame, values=names)
         self.conn_from_cb.pack()
         tk.Label(control_frame, text="To:").pack()
-        self.conn_to_cb = ttk.Combobox(control_frame, values=self.get_item_names())
+        self.conn_to_cb = ttk.Combobox(control_frame, values=names)
         self.conn_to_cb.pack()
         tk.Label(control_frame, text="Connection Type:").pack()
         self.conn_type_cb = ttk.Combobox(control_frame, values=['physical', 'flow', 'energy', 'state'])
@@ -129,16 +170,17 @@ class SystemModelUI:
         viz_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.tree = ttk.Treeview(viz_frame)
         self.tree.pack(fill=tk.BOTH, expand=True)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
+        self._node_ids = {}      # item id -> tree id, for rows inserted so far
+        self._detail_rows = {}   # item id -> tree ids of its Attr/Conn rows
+        self._seen_generation = None
         self.refresh_tree()
 
     def get_item_names(self):
-        return [item.name for item in self.model.items.values()]
+        return self.model.item_names()
 
     def find_item_by_name(self, name):
-        for item in self.model.items.values():
-            if item.name == name:
-                return item
-        return None
+        return self.model.find_by_name(name)
 
     def create_system_item(self):
         name = self.name_entry.get().strip()
@@ -155,7 +197,11 @@ class SystemModelUI:
                 return
             parent_id = parent.id
 
-        item = self.model.create_item(name, desc, parent_id)
+        try:
+            item = self.model.create_item(name, desc, parent_id)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
         messagebox.showinfo("Success", f"Created system item: {name}")
         self.refresh_controls()
         self.refresh_tree()
@@ -179,7 +225,7 @@ class SystemModelUI:
             item.add_attribute(attr_type, attr_desc)
             self.model.save()
             messagebox.showinfo("Success", f"Added attribute to {item.name}")
-            self.refresh_tree()
+            self.refresh_tree(dirty=(item.id,))
 
     def create_connection(self):
         from_name = self.conn_from_cb.get().strip()
@@ -196,37 +242,74 @@ class SystemModelUI:
             return
         self.model.add_relationship(from_item, to_item, conn_type, desc)
         messagebox.showinfo("Success", f"Created connection from {from_name} to {to_name}")
-        self.refresh_tree()
+        self.refresh_tree(dirty=(from_item.id,))
 
     def refresh_controls(self):
+        # The name list only changes when items are added or reloaded
+        if self._combo_generation == self.model.tree_generation:
+            return
+        self._combo_generation = self.model.tree_generation
         names = self.get_item_names()
         self.parent_cb['values'] = names
         self.conn_from_cb['values'] = names
         self.conn_to_cb['values'] = names
 
-    def refresh_tree(self):
+    def refresh_tree(self, dirty=()):
+        # Same hierarchy as last build: only redo the detail rows of the dirty items
+        if self._seen_generation == self.model.tree_generation:
+            for item_id in dirty:
+                tree_id = self._node_ids.get(item_id)
+                item = self.model.get_item(item_id)
+                if not (tree_id and item):
+                    continue
+                if item_id in self._detail_rows:
+                    self.tree.delete(*self._detail_rows.pop(item_id))
+                    self.insert_details(item, tree_id)
+                elif not self.tree.get_children(tree_id):
+                    # Not expanded yet and previously a leaf: give it something to expand
+                    self.tree.insert(tree_id, 'end', text="…", tags=(PLACEHOLDER_TAG,))
+            return
+        self._seen_generation = self.model.tree_generation
+        self._node_ids.clear()
+        self._detail_rows.clear()
         self.tree.delete(*self.tree.get_children())
-        # Parent-child map
-        children_map = {}
-        roots = []
-        for item in self.model.items.values():
-            if item.parent_id:
-                children_map.setdefault(item.parent_id, []).append(item)
-            else:
-                roots.append(item)
-        def insert_node(node, parent_tree_id=''):
-            display_text = f"{node.name} (ID: {node.id[:8]})"
-            tree_id = self.tree.insert(parent_tree_id, 'end', text=display_text, values=[node.id])
-            for attr_type, attr in node.attributes.items():
-                self.tree.insert(tree_id, 'end', text=f"Attr: {attr_type} - {attr.description}")
-            for conn in node.connections:
-                target = self.model.get_item(conn.target_id)
-                target_name = target.name if target else 'Unknown'
-                self.tree.insert(tree_id, 'end', text=f"Conn: {conn.conn_type} to {target_name} ({conn.description})")
-            for child in children_map.get(node.id, []):
-                insert_node(child, tree_id)
-        for root_item in roots:
-            insert_node(root_item)
+        roots, self._children_map = self.model.children_by_parent()
+        # Only roots are inserted; details and children are filled in on <<TreeviewOpen>>
+        with frozen_tree(self.tree):
+            self.insert_nodes(roots)
+
+    def insert_nodes(self, nodes, parent_tree_id=''):
+        # One batch for the whole level, expand placeholders included
+        rows = []
+        for node in nodes:
+            tree_id = new_row_id()
+            rows.append((parent_tree_id, tree_id, f"{node.name} (ID: {node.id[:8]})", (node.id,), ()))
+            self._node_ids[node.id] = tree_id
+            if node.attributes or node.connections or node.id in self._children_map:
+                rows.append((tree_id, new_row_id(), "…", (), (PLACEHOLDER_TAG,)))
+        batch_insert(self.tree, rows)
+
+    def on_tree_open(self, event):
+        tree_id = self.tree.focus()
+        if not tree_id:
+            return
+        children = self.tree.get_children(tree_id)
+        if len(children) != 1 or PLACEHOLDER_TAG not in self.tree.item(children[0], 'tags'):
+            return
+        self.tree.delete(children[0])
+        node = self.model.get_item(self.tree.item(tree_id)['values'][0])
+        if node:
+            self.insert_details(node, tree_id)
+            self.insert_nodes(self._children_map.get(node.id, []), tree_id)
+
+    def insert_details(self, node, tree_id):
+        # Attr/Conn rows always come first under a node, ahead of its child items
+        texts = [f"Attr: {attr_type} - {desc}" for attr_type, desc in node.attributes.items()]
+        for target_id, conn_type, desc in node.connections:
+            target = self.model.get_item(target_id)
+            target_name = target.name if target else 'Unknown'
+            texts.append(f"Conn: {conn_type} to {target_name} ({desc})")
+        self._detail_rows[node.id] = [self.tree.insert(tree_id, i, text=text) for i, text in enumerate(texts)]
 # To run the app:
 def run_gui_app():
     root = tk.Tk()
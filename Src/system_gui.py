@@ -1,16 +1,29 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from system_model import SystemModel
+from tree_utils import LazyItemTreeMixin
 
-class SystemModelGUI:
+class SystemModelGUI(LazyItemTreeMixin):
     def __init__(self, root):
         self.root = root
         self.root.title("System Modeler")
         self.model = SystemModel()
+        # Edits are saved debounced on this root's event loop; closing writes what is pending
+        self.model.save_root = root
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.selected_code = None
+        self._combo_after = None  # after_idle id of a pending parent option update
         self.build_ui()
         self.refresh_tree()
 
+    def on_close(self):
+        try:
+            self.model.flush_save(compact=True)
+        except Exception as exc:
+            messagebox.showerror("Save Failed", f"Recent changes could not be saved:\n{exc}")
+        finally:
+            self.root.destroy()
+
     def build_ui(self):
         frame = tk.Frame(self.root)
         frame.pack(fill=tk.BOTH, expand=True)
@@ -57,6 +70,7 @@ class SystemModelGUI:
         self.tree = ttk.Treeview(rf)
         self.tree.pack(fill=tk.BOTH, expand=True)
         self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
 
     def use_selected_as_parent(self):
         if self.selected_code:
@@ -84,7 +98,7 @@ class SystemModelGUI:
             self.desc_entry.delete(0, tk.END)
             self.parent_cb.set("")
             self.parent_entry.delete(0, tk.END)
-            self.refresh_tree()
+            self.show_new_item(item, parent_code)
         except Exception as e:
             messagebox.showerror("Creation Failed", str(e))
 
@@ -97,29 +111,11 @@ class SystemModelGUI:
         if not attr_type or not desc:
             messagebox.showerror("Missing Info", "Attribute type and description required.")
             return
+        item = self.model.get_item(self.selected_code)
+        is_new = item is not None and attr_type.lower() not in item.attributes
         self.model.add_attribute(self.selected_code, attr_type, desc)
         self.attr_desc.delete(0, tk.END)
-        self.refresh_tree()
-
-    def refresh_tree(self):
-        self.tree.delete(*self.tree.get_children())
-        roots = [item for item in self.model.items.values() if item.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_tree_node(root, "")
-        self.update_parent_options()
-
-    def insert_tree_node(self, item, parent):
-        node_id = self.tree.insert(parent, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for k, v in item.attributes.items():
-            self.tree.insert(node_id, "end", text=f"Attr: {k} - {v}")
-        for child_code in item.children_codes:
-            child = self.model.get_item(child_code)
-            if child:
-                self.insert_tree_node(child, node_id)
-
-    def update_parent_options(self):
-        items = sorted(self.model.items.values(), key=lambda i: i.full_code)
-        self.parent_cb["values"] = [f"{i.name} | {i.full_code}" for i in items]
+        self.show_attribute(self.selected_code, attr_type.lower(), is_new)
 
     def on_select(self, event):
         sel = self.tree.selection()
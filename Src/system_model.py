@@ -1,9 +1,22 @@
-import uuid
-import json
+import sys
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from uuid_pool import new_uuid
+from json_io import iter_json_list
+from deferred_save import DeferredSaveMixin
+
+# The attribute types an item can carry, in the order they are listed
+ATTRIBUTE_TYPES = ("mechanical", "fluid", "energy", "state")
+_ATTR_TYPES = frozenset(ATTRIBUTE_TYPES)  # for membership tests
 
 class SystemItem:
+    # No per-instance __dict__: large projects hold one of these per node
+    __slots__ = ("uuid", "name", "description", "level", "child_index", "code",
+                 "parent_code", "full_code", "children_codes", "technology_refs", "_dict_cache",
+                 # One slot per attribute type (None when unset) rather than a dict per item
+                 "attr_mechanical", "attr_fluid", "attr_energy", "attr_state")
+
     def __init__(
         self,
         name: str,
@@ -12,7 +25,7 @@ class SystemItem:
         level: int = 0,
         child_index: Optional[int] = None
     ):
-        self.uuid = str(uuid.uuid4())
+        self.uuid = new_uuid()
         self.name = name
         self.description = description
         self.level = level
@@ -20,24 +33,43 @@ class SystemItem:
         self.code = self.generate_code(self.level, self.child_index)
         # Parent code = always last 6 digits of parent's code (or 000000 for top)
         if parent_code and len(parent_code) >= 6:
-            self.parent_code = parent_code[-6:]
+            self.parent_code = sys.intern(parent_code[-6:])
         else:
             self.parent_code = "000000"
         self.full_code = f"{self.parent_code}{self.code}"  # Always 12 digits
-        self.attributes: Dict[str, str] = {}
-        self.children_codes: List[str] = []
-        self.technology_refs: List[str] = []
+        self.attr_mechanical = self.attr_fluid = self.attr_energy = self.attr_state = None
+        # Leaves, most of the tree, share this empty tuple; create_item gives an item its list
+        self.children_codes: Sequence[str] = ()
+        self.technology_refs: Set[str] = set()  # assigned 12-digit tech codes
+        self._dict_cache: Optional[Dict] = None  # to_dict() result until the next change
 
     def generate_code(self, level: int, index: int) -> str:
-        return f"{level:02d}{index:04d}"
+        # 6-digit codes repeat across the tree and key the model's indexes: share one copy of each
+        return sys.intern(f"{level:02d}{index:04d}")
 
     def add_attribute(self, attr_type: str, description: str):
-        if attr_type.lower() not in ["mechanical", "fluid", "energy", "state"]:
+        attr = attr_type.lower()
+        if attr not in _ATTR_TYPES:
             raise ValueError(f"Invalid type: {attr_type}")
-        self.attributes[attr_type.lower()] = description
+        setattr(self, "attr_" + attr, description)
+        self._dict_cache = None
+
+    @property
+    def attributes(self) -> Dict[str, str]:
+        """The set attributes as a new {type: description} dict, in ATTRIBUTE_TYPES order."""
+        values = (self.attr_mechanical, self.attr_fluid, self.attr_energy, self.attr_state)
+        return {attr_type: value for attr_type, value in zip(ATTRIBUTE_TYPES, values) if value is not None}
+
+    def changed(self):
+        """Call after modifying fields directly, so to_dict() rebuilds its record."""
+        self._dict_cache = None
 
     def to_dict(self):
-        return {
+        # Built once per change and shared by every save until the next one;
+        # the record is never modified in place, only replaced
+        if self._dict_cache is not None:
+            return self._dict_cache
+        self._dict_cache = {
             "uuid": self.uuid,
             "name": self.name,
             "description": self.description,
@@ -46,88 +78,184 @@ class SystemItem:
             "code": self.code,
             "parent_code": self.parent_code,
             "full_code": self.full_code,
+            # Copies, so a snapshot taken for a background save stays fixed;
+            # refs are sorted so the saved file does not depend on set order
             "attributes": self.attributes,
-            "children_codes": self.children_codes,
-            "technology_refs": self.technology_refs
+            "children_codes": list(self.children_codes),
+            "technology_refs": sorted(self.technology_refs)
         }
+        return self._dict_cache
 
     @classmethod
     def from_dict(cls, data):
-        item = cls(
-            name=data["name"],
-            description=data.get("description", ""),
-            parent_code=data.get("parent_code", "000000"),
-            level=data.get("level", 0),
-            child_index=data.get("child_index", 1)
-        )
+        # Runs once per record on load: fill the slots directly rather than via
+        # __init__, whose fresh uuid and formatted code would be overwritten anyway
+        item = cls.__new__(cls)
+        item.name = data["name"]
+        item.description = data.get("description", "")
+        # level is kept alongside code so nothing re-parses code[:2]; older records may lack it
+        item.level = data["level"] if "level" in data else int(data["code"][:2])
+        item.child_index = data.get("child_index", 1) or 1
+        parent_code = data.get("parent_code", "000000")
+        item.parent_code = sys.intern(parent_code[-6:]) if parent_code and len(parent_code) >= 6 else "000000"
         item.uuid = data["uuid"]
-        item.code = data["code"]
+        item.code = sys.intern(data["code"])
         item.full_code = data["full_code"]
-        item.attributes = data.get("attributes", {})
-        item.children_codes = data.get("children_codes", [])
-        item.technology_refs = data.get("technology_refs", [])
+        attributes = data.get("attributes") or {}
+        item.attr_mechanical = attributes.get("mechanical")
+        item.attr_fluid = attributes.get("fluid")
+        item.attr_energy = attributes.get("energy")
+        item.attr_state = attributes.get("state")
+        item.children_codes = data.get("children_codes") or ()
+        item.technology_refs = set(data.get("technology_refs", []))
+        item._dict_cache = None
         return item
 
-class SystemModel:
+class SystemModel(DeferredSaveMixin):
     def __init__(self, db_path="systems.json"):
         self.db_path = db_path
         self.items: Dict[str, SystemItem] = {}
+        self._init_deferred_save()
+        # Bumped on every structural change (add/remove/reload) so views can tell
+        # whether their rows still match the hierarchy
+        self.tree_generation = 0
+        # (sorted roots, sorted children by parent code); reset whenever items change
+        self._tree_cache: Optional[Tuple[List[SystemItem], Dict[str, List[SystemItem]]]] = None
+        # (first item per 6-digit code, sibling count per (parent code, level)) for
+        # create_item; kept current by create_item, rebuilt on demand after removals and reloads
+        self._code_index: Optional[Tuple[Dict[str, SystemItem], Dict[Tuple[str, int], int]]] = None
         self.load()
 
     def create_item(self, name: str, description: str = "", parent_code: Optional[str] = None) -> SystemItem:
         level, index = 0, 1
         # Use only last 6 digits for parent code reference
         parent6 = (parent_code[-6:] if parent_code and len(parent_code) >= 6 else "000000")
+        by_code, sibling_counts = self._index()
+        parent = None
         if parent6 != "000000":
-            parent = None
-            for itm in self.items.values():
-                if itm.full_code[-6:] == parent6:
-                    parent = itm
-                    break
+            parent = by_code.get(parent6)
             if not parent:
                 raise ValueError("Parent not found.")
-            level = int(parent.code[:2]) + 1
-            siblings = [
-                item for item in self.items.values()
-                if item.parent_code == parent6 and int(item.code[:2]) == level
-            ]
-            index = len(siblings) + 1
+            level = parent.level + 1
+            index = sibling_counts.get((parent6, level), 0) + 1
         else:
             parent6 = "000000"
         item = SystemItem(name, description, parent6, level, index)
+        if item.full_code in self.items:
+            self._code_index = None  # replaces an item; rebuild rather than patch
+        else:
+            by_code.setdefault(item.code, item)
+            sibling_counts[(parent6, level)] = sibling_counts.get((parent6, level), 0) + 1
         self.items[item.full_code] = item
+        self._tree_cache = None
+        self.tree_generation += 1
         # Register as child in parent
-        for itm in self.items.values():
-            if itm.code == parent6 and parent6 != "000000":
-                itm.children_codes.append(item.full_code)
-        self.save()
+        if parent:
+            if parent.children_codes:
+                parent.children_codes.append(item.full_code)
+            else:
+                parent.children_codes = [item.full_code]
+            parent.changed()
+            self.schedule_save(item.full_code, parent.full_code)
+        else:
+            self.schedule_save(item.full_code)
         return item
 
+    def _index(self) -> Tuple[Dict[str, SystemItem], Dict[Tuple[str, int], int]]:
+        if self._code_index is None:
+            by_code: Dict[str, SystemItem] = {}
+            sibling_counts: Dict[Tuple[str, int], int] = {}
+            for item in self.items.values():
+                by_code.setdefault(item.code, item)  # first match, as a scan would find
+                key = (item.parent_code, item.level)
+                sibling_counts[key] = sibling_counts.get(key, 0) + 1
+            self._code_index = (by_code, sibling_counts)
+        return self._code_index
+
     def get_item(self, code: str):
         return self.items.get(code)
 
+    def remove_item(self, code: str) -> Optional[SystemItem]:
+        item = self.items.pop(code, None)
+        if item:
+            self._tree_cache = None
+            self._code_index = None
+            self.tree_generation += 1
+        return item
+
+    def children_by_parent(self) -> Tuple[List[SystemItem], Dict[str, List[SystemItem]]]:
+        """Group items by 6-digit parent code in one pass; roots and buckets sorted by code."""
+        if self._tree_cache is not None:
+            return self._tree_cache
+        roots: List[SystemItem] = []
+        children: Dict[str, List[SystemItem]] = {}
+        for item in self.items.values():
+            if item.parent_code == "000000":
+                roots.append(item)
+            else:
+                children.setdefault(item.parent_code, []).append(item)
+        roots.sort(key=lambda x: x.code)
+        for bucket in children.values():
+            bucket.sort(key=lambda x: x.code)
+        self._tree_cache = (roots, children)
+        return self._tree_cache
+
+    def get_sorted_roots(self) -> List[SystemItem]:
+        return self.children_by_parent()[0]
+
+    def get_sorted_children(self, parent_code: str) -> List[SystemItem]:
+        return self.children_by_parent()[1].get(parent_code[-6:], [])
+
+    def update_item(self, item_code: str, name: Optional[str] = None, description: Optional[str] = None):
+        """Change an item's name and/or description (None leaves a field as it is)."""
+        item = self.get_item(item_code)
+        if item:
+            if name is not None:
+                item.name = name
+            if description is not None:
+                item.description = description
+            item.changed()
+            self.schedule_save(item_code)
+
     def add_attribute(self, item_code: str, attr_type: str, description: str):
         item = self.get_item(item_code)
         if item:
             item.add_attribute(attr_type, description)
-            self.save()
+            self.schedule_save(item_code)
 
     def assign_technology(self, item_code: str, tech_code: str):
         item = self.get_item(item_code)
         if item and tech_code not in item.technology_refs:
-            item.technology_refs.append(tech_code)
-            self.save()
+            item.technology_refs.add(tech_code)
+            item.changed()
+            self.schedule_save(item_code)
+
+    def unassign_technology(self, item_code: str, tech_code: str):
+        item = self.get_item(item_code)
+        if item and tech_code in item.technology_refs:
+            item.technology_refs.discard(tech_code)
+            item.changed()
+            self.schedule_save(item_code)
 
-    def save(self):
-        with open(self.db_path, "w") as f:
-            json.dump([i.to_dict() for i in self.items.values()], f, indent=2)
+    def export(self) -> List[Dict]:
+        return [i.to_dict() for i in self.items.values()]
 
     def load(self):
+        self.flush_save()  # pending edits reach disk before it is re-read
+        stamp = self._file_stamp()
+        if self.items and stamp == self._loaded_stamp:
+            return  # files untouched since they were last read or written here
+        # Unchanged records keep their existing item objects
+        items: Dict[str, SystemItem] = {}
         if os.path.exists(self.db_path):
-            with open(self.db_path) as f:
-                for data in json.load(f):
-                    item = SystemItem.from_dict(data)
-                    self.items[item.full_code] = item
+            for data in iter_json_list(self.db_path):
+                self._merge_record(items, data, SystemItem)
+        self._replay_journal(items, SystemItem)
+        self._loaded_stamp = stamp
+        if self._swap_items(items):
+            self._tree_cache = None
+            self._code_index = None
+            self.tree_generation += 1
 
 # Usage Example (uncomment to test directly):
 # if __name__ == "__main__":
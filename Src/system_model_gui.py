@@ -1,143 +1,32 @@
-import uuid
-import json
-import os
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Dict, List, Optional
 
-# ====== Data Structures ====== #
-
-class SystemItem:
-    def __init__(
-        self,
-        name: str,
-        description: str = "",
-        parent_code: Optional[str] = None,
-        level: int = 0,
-        child_index: Optional[int] = None
-    ):
-        self.uuid = str(uuid.uuid4())
-        self.name = name
-        self.description = description
-        self.level = level
-        self.child_index = child_index or 1
-        self.code = self.generate_code(self.level, self.child_index)
-        # FIX: Parent code is always last 6 digits (or "000000" for root)
-        if parent_code and len(parent_code) >= 6:
-            self.parent_code = parent_code[-6:]
-        else:
-            self.parent_code = "000000"
-        self.full_code = f"{self.parent_code}{self.code}"  # Always 12 digits
-        self.attributes: Dict[str, str] = {}
-        self.children_codes: List[str] = []
-        self.technology_refs: List[str] = []
-
-    def generate_code(self, level: int, index: int) -> str:
-        return f"{level:02d}{index:04d}"
-
-    def add_attribute(self, attr_type: str, description: str):
-        if attr_type.lower() not in ["mechanical", "fluid", "energy", "state"]:
-            raise ValueError(f"Invalid type: {attr_type}")
-        self.attributes[attr_type.lower()] = description
-
-    def to_dict(self):
-        return {
-            "uuid": self.uuid,
-            "name": self.name,
-            "description": self.description,
-            "level": self.level,
-            "child_index": self.child_index,
-            "code": self.code,
-            "parent_code": self.parent_code,
-            "full_code": self.full_code,
-            "attributes": self.attributes,
-            "children_codes": self.children_codes,
-            "technology_refs": self.technology_refs
-        }
-
-    @classmethod
-    def from_dict(cls, data):
-        item = cls(
-            name=data["name"],
-            description=data.get("description", ""),
-            parent_code=data.get("parent_code", "000000"),
-            level=data.get("level", 0),
-            child_index=data.get("child_index", 1)
-        )
-        item.uuid = data["uuid"]
-        item.code = data["code"]
-        item.full_code = data["full_code"]
-        item.attributes = data.get("attributes", {})
-        item.children_codes = data.get("children_codes", [])
-        item.technology_refs = data.get("technology_refs", [])
-        return item
-
-class SystemModel:
-    def __init__(self, db_path="systems.json"):
-        self.db_path = db_path
-        self.items: Dict[str, SystemItem] = {}
-        self.load()
-
-    def create_item(self, name: str, description: str = "", parent_code: Optional[str] = None) -> SystemItem:
-        level, index = 0, 1
-        # Only the last 6 digits for parent_code reference
-        parent6 = (parent_code[-6:] if parent_code and len(parent_code) >= 6 else "000000")
-        if parent6 != "000000":
-            parent = None
-            for itm in self.items.values():
-                if itm.full_code[-6:] == parent6:
-                    parent = itm
-                    break
-            if not parent:
-                raise ValueError("Parent not found.")
-            level = int(parent.code[:2]) + 1
-            siblings = [
-                item for item in self.items.values()
-                if item.parent_code == parent6 and int(item.code[:2]) == level
-            ]
-            index = len(siblings) + 1
-        else:
-            parent6 = "000000"
-        item = SystemItem(name, description, parent6, level, index)
-        self.items[item.full_code] = item
-        # Register as child in parent
-        for itm in self.items.values():
-            if itm.code == parent6 and parent6 != "000000":
-                itm.children_codes.append(item.full_code)
-        self.save()
-        return item
-
-    def get_item(self, code: str):
-        return self.items.get(code)
-
-    def add_attribute(self, item_code: str, attr_type: str, description: str):
-        item = self.get_item(item_code)
-        if item:
-            item.add_attribute(attr_type, description)
-            self.save()
-
-    def save(self):
-        with open(self.db_path, "w") as f:
-            json.dump([i.to_dict() for i in self.items.values()], f, indent=2)
-
-    def load(self):
-        if os.path.exists(self.db_path):
-            with open(self.db_path) as f:
-                for data in json.load(f):
-                    item = SystemItem.from_dict(data)
-                    self.items[item.full_code] = item
+from system_model import SystemModel
+from tree_utils import LazyItemTreeMixin
 
 # ====== Tkinter GUI ====== #
 
-class SystemModelGUI:
+class SystemModelGUI(LazyItemTreeMixin):
     def __init__(self, root):
         self.root = root
         self.root.title("System Modeler")
         self.model = SystemModel()
+        # Edits are saved debounced on this root's event loop; closing writes what is pending
+        self.model.save_root = root
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.selected_code = None
+        self._combo_after = None  # after_idle id of a pending parent option update
         self.build_ui()
         self.refresh_tree()
 
+    def on_close(self):
+        try:
+            self.model.flush_save(compact=True)
+        except Exception as exc:
+            messagebox.showerror("Save Failed", f"Recent changes could not be saved:\n{exc}")
+        finally:
+            self.root.destroy()
+
     def build_ui(self):
         frame = tk.Frame(self.root)
         frame.pack(fill=tk.BOTH, expand=True)
@@ -184,6 +73,7 @@ class SystemModelGUI:
         self.tree = ttk.Treeview(rf)
         self.tree.pack(expand=True, fill=tk.BOTH)
         self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
 
     def use_selected_as_parent(self):
         if self.selected_code:
@@ -210,8 +100,7 @@ class SystemModelGUI:
             self.desc_entry.delete(0, tk.END)
             self.parent_entry.delete(0, tk.END)
             self.parent_cb.set("")
-            self.refresh_tree()
-            self.refresh_combo()
+            self.show_new_item(item, parent_code)
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
@@ -224,33 +113,11 @@ class SystemModelGUI:
         if not attr_type or not desc:
             messagebox.showerror("Missing", "Provide attribute type and description")
             return
+        item = self.model.get_item(self.selected_code)
+        is_new = item is not None and attr_type.lower() not in item.attributes
         self.model.add_attribute(self.selected_code, attr_type, desc)
         self.attr_desc.delete(0, tk.END)
-        self.refresh_tree()
-
-    def refresh_tree(self):
-        self.tree.delete(*self.tree.get_children())
-        roots = [item for item in self.model.items.values() if item.parent_code == "000000"]
-        for root in sorted(roots, key=lambda x: x.code):
-            self.insert_tree_node(root, "")
-        self.refresh_combo()
-
-    def insert_tree_node(self, item, parent_node):
-        node_id = self.tree.insert(
-            parent_node, "end", text=f"{item.name} | {item.full_code}",
-            values=[item.full_code]
-        )
-        for k, v in item.attributes.items():
-            self.tree.insert(node_id, "end", text=f"Attr: {k} - {v}")
-        for child_code in item.children_codes:
-            child = self.model.get_item(child_code)
-            if child:
-                self.insert_tree_node(child, node_id)
-
-    def refresh_combo(self):
-        all_items = self.model.items.values()
-        sorted_items = sorted(all_items, key=lambda i: i.full_code)
-        self.parent_cb["values"] = [f"{i.name} | {i.full_code}" for i in sorted_items]
+        self.show_attribute(self.selected_code, attr_type.lower(), is_new)
 
     def on_select(self, event):
         sel = self.tree.selection()
@@ -5,6 +5,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Dict, List, Optional
 
+from json_io import iter_json_list
+
 # ========== Core Data Model ==========
 
 class SystemItem:
@@ -113,11 +115,10 @@ class SystemModel:
 
     def load(self):
         if os.path.exists(self.db_path):
-            with open(self.db_path, "r") as f:
-                data = json.load(f)
-                for obj in data:
-                    item = SystemItem.from_dict(obj)
-                    self.items[item.full_code] = item
+            # One record at a time (streamed from disk when the file is large)
+            for data in iter_json_list(self.db_path):
+                item = SystemItem.from_dict(data)
+                self.items[item.full_code] = item
 
 # ========== Tkinter GUI ==========
 
@@ -207,14 +208,18 @@ class SystemModelGUI:
         for root_item in roots:
             self.insert_node(root_item, "")
     def insert_node(self, item, parent_id):
-        node_id = self.tree.insert(parent_id, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
-        for k, v in item.attributes.items():
-            self.tree.insert(node_id, "end", text=f"Attr: {k} - {v}", values=[""])
-        # Show children recursively
-        for child_code in item.children_codes:
-            child = self.model.get_item(child_code)
-            if child:
-                self.insert_node(child, node_id)
+        # Walk the subtree with an explicit stack: deep hierarchies would exceed the recursion limit
+        stack = [(item, parent_id)]
+        while stack:
+            item, parent_id = stack.pop()
+            node_id = self.tree.insert(parent_id, "end", text=f"{item.name} | {item.full_code}", values=[item.full_code])
+            for k, v in item.attributes.items():
+                self.tree.insert(node_id, "end", text=f"Attr: {k} - {v}", values=[""])
+            # Pushed in reverse so children come off the stack, and are inserted, in order
+            for child_code in reversed(item.children_codes):
+                child = self.model.get_item(child_code)
+                if child:
+                    stack.append((child, node_id))
 
     def on_tree_select(self, event):
         sel = self.tree.selection()
@@ -5,6 +5,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Dict, List, Optional
 
+from json_io import iter_json_list
+
 # ========== Data Structures ========== #
 
 class SystemItem:
@@ -113,10 +115,10 @@ class SystemModel:
 
     def load(self):
         if os.path.exists(self.db_path):
-            with open(self.db_path) as f:
-                for data in json.load(f):
-                    item = SystemItem.from_dict(data)
-                    self.items[item.full_code] = item
+            # One record at a time (streamed from disk when the file is large)
+            for data in iter_json_list(self.db_path):
+                item = SystemItem.from_dict(data)
+                self.items[item.full_code] = item
 
 # ========== GUI ========== #
 
@@ -230,16 +232,21 @@ class SystemModelGUI:
         self.refresh_combo()
 
     def insert_tree_node(self, item, parent_node):
-        node_id = self.tree.insert(
-            parent_node, "end", text=f"{item.name} | {item.full_code}",
-            values=[item.full_code]
-        )
-        for k, v in item.attributes.items():
-            self.tree.insert(node_id, "end", text=f"Attr: {k} - {v}")
-        for child_code in item.children_codes:
-            child = self.model.get_item(child_code)
-            if child:
-                self.insert_tree_node(child, node_id)
+        # Explicit stack rather than recursion, so deep hierarchies stay within the recursion limit
+        stack = [(item, parent_node)]
+        while stack:
+            item, parent_node = stack.pop()
+            node_id = self.tree.insert(
+                parent_node, "end", text=f"{item.name} | {item.full_code}",
+                values=[item.full_code]
+            )
+            for k, v in item.attributes.items():
+                self.tree.insert(node_id, "end", text=f"Attr: {k} - {v}")
+            # Reversed, so children are popped and inserted in order
+            for child_code in reversed(item.children_codes):
+                child = self.model.get_item(child_code)
+                if child:
+                    stack.append((child, node_id))
 
     def refresh_combo(self):
         all_items = self.model.items.values()
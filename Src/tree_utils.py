@@ -0,0 +1,365 @@
+"""
+tree_utils.py
+
+Helpers shared by the ttk.Treeview (and Listbox) based GUIs.
+"""
+
+import bisect
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+from itertools import count
+
+
+@contextmanager
+def frozen_tree(tree):
+    """
+    Unmap a Treeview and hide its data columns while it is bulk-populated,
+    so Tk lays out and redraws once when the batch is done instead of per row.
+    """
+    manager = tree.winfo_manager()
+    pack_info = tree.pack_info() if manager == "pack" else None
+    if pack_info:
+        # Re-packing appends to the packing order; pin the tree ahead of the
+        # widget that followed it so it comes back in the same place
+        slaves = pack_info["in"].pack_slaves()
+        position = slaves.index(tree)
+        if position + 1 < len(slaves):
+            pack_info["before"] = slaves[position + 1]
+    display = tree["displaycolumns"]
+    tree["displaycolumns"] = ()
+    if pack_info:
+        tree.pack_forget()
+    elif manager == "grid":
+        tree.grid_remove()
+    try:
+        yield tree
+    finally:
+        tree["displaycolumns"] = display
+        if pack_info:
+            tree.pack(**pack_info)
+        elif manager == "grid":
+            tree.grid()
+
+
+PLACEHOLDER_TAG = "placeholder"
+
+# Tcl lambda run by batch_insert(): the whole insert loop executes inside Tcl
+_BATCH_INSERT = """{w rows} {
+    foreach {parent iid text values tags} $rows {
+        $w insert $parent end -id $iid -text $text -values $values -tags $tags
+    }
+}"""
+_row_ids = count(1)
+
+
+def new_row_id():
+    """A fresh item id for rows inserted through batch_insert()."""
+    return f"row{next(_row_ids)}"
+
+
+def batch_insert(tree, rows):
+    """
+    Insert rows of (parent iid, iid, text, values, tags) into tree with a
+    single Tcl call instead of one tree.insert() round trip per row. Parents
+    must come before their children. The fields travel as Tcl list elements,
+    so names containing braces or spaces need no quoting.
+    """
+    flat = []
+    for row in rows:
+        flat.extend(row)
+    if flat:
+        tree.tk.call("apply", _BATCH_INSERT, tree._w, tuple(flat))
+
+
+def insert_lazy_nodes(tree, parent, items, children_by_parent, node_ids=None):
+    """
+    Insert items under parent without their subtrees. Items that have children
+    get a single placeholder row so Tk still draws an expand indicator.
+    If node_ids is given, the new rows are recorded in it as
+    (parent iid, full_code) -> iid.
+    """
+    # The whole level, placeholders included, goes to Tk in one batch
+    rows = []
+    for item in items:
+        node_id = new_row_id()
+        rows.append((parent, node_id, f"{item.name} | {item.full_code}", (item.full_code,), ()))
+        if node_ids is not None:
+            node_ids[(parent, item.full_code)] = node_id
+        if children_by_parent.get(item.code):
+            rows.append((node_id, new_row_id(), "…", (), (PLACEHOLDER_TAG,)))
+    batch_insert(tree, rows)
+
+
+def expand_lazy_node(tree, node_id, children_by_parent, node_ids=None):
+    """Swap node_id's placeholder for its real children (no-op once expanded)."""
+    if not node_id:
+        return
+    children = tree.get_children(node_id)
+    if len(children) != 1 or PLACEHOLDER_TAG not in tree.item(children[0], "tags"):
+        return
+    tree.delete(children[0])
+    code = str(tree.item(node_id, "values")[0])
+    insert_lazy_nodes(tree, node_id, children_by_parent.get(code[-6:], ()), children_by_parent, node_ids)
+
+
+def recycle_lazy_tree(tree, roots, children_by_parent, node_ids):
+    """
+    Bring a lazily filled tree (see insert_lazy_nodes) in line with the model,
+    reusing the rows it already has. node_ids maps (parent iid, full_code) ->
+    iid of every realized row and is updated in place; rows are keyed by parent
+    row as 6-digit codes repeat, so one item can be listed under several rows.
+    Only realized levels are visited: surviving rows are moved to their new
+    position and relabelled, new items are inserted there, and rows of items
+    that vanished or now sit under a collapsed node are deleted. Collapsed nodes
+    just get their placeholder added or dropped to match whether they still
+    have children.
+    """
+    if not node_ids:
+        # Nothing to recycle: plain batched fill
+        tree.delete(*tree.get_children())
+        insert_lazy_nodes(tree, "", roots, children_by_parent, node_ids)
+        return
+    stale = dict(node_ids)  # rows not yet claimed by an item
+    node_ids.clear()
+    pending = [("", roots)]
+    while pending:
+        parent, items = pending.pop()
+        for index, item in enumerate(items):
+            code = item.full_code
+            text = f"{item.name} | {code}"
+            children = children_by_parent.get(item.code, ())
+            iid = stale.pop((parent, code), None)
+            if iid is None:
+                iid = tree.insert(parent, index, iid=new_row_id(), text=text, values=(code,))
+                if children:
+                    tree.insert(iid, "end", text="…", tags=(PLACEHOLDER_TAG,))
+            else:
+                tree.move(iid, parent, index)
+                tree.item(iid, text=text)
+                rows = tree.get_children(iid)
+                if rows and PLACEHOLDER_TAG in tree.item(rows[0], "tags"):
+                    if not children:
+                        tree.delete(rows[0])
+                elif rows:
+                    pending.append((iid, children))  # expanded: recycle its level too
+                elif children:
+                    # A leaf can be left open (double-click opens it too), and an open
+                    # node gets no <<TreeviewOpen>> to swap the placeholder: close it
+                    tree.item(iid, open=False)
+                    tree.insert(iid, "end", text="…", tags=(PLACEHOLDER_TAG,))
+            node_ids[(parent, code)] = iid
+    for iid in stale.values():
+        if tree.exists(iid):  # may already be gone with a deleted parent
+            tree.delete(iid)
+
+
+def sync_tree(tree, roots, children_by_parent, node_ids):
+    """
+    Bring a fully expanded tree in line with the model instead of rebuilding it.
+    node_ids maps (parent iid, full_code) -> (iid, text) for rows already in the
+    tree and is updated in place: rows of vanished items are deleted, renamed
+    rows get new text, and new items are inserted under their parent's row, in
+    model order. Rows are keyed by parent row because 6-digit codes repeat
+    across the tree, so one item can be listed under several rows.
+    """
+    seen = set()
+    new_rows = []  # (parent iid, iid, text, values, tags); parents precede children
+    child_rows = {}  # parent iid -> child iids in model order
+    level = [(item, "") for item in roots]
+    while level:  # breadth first
+        next_level = []
+        for item, parent_iid in level:
+            key = (parent_iid, item.full_code)
+            text = f"{item.name} | {item.full_code}"
+            row = node_ids.get(key)
+            if row is None:
+                row = node_ids[key] = (new_row_id(), text)
+                new_rows.append((parent_iid, row[0], text, (item.full_code,), ()))
+            elif row[1] != text:
+                tree.item(row[0], text=text)
+                node_ids[key] = (row[0], text)
+            seen.add(key)
+            child_rows.setdefault(parent_iid, []).append(row[0])
+            next_level.extend((child, row[0]) for child in children_by_parent.get(item.code, ()))
+        level = next_level
+
+    for key in [k for k in node_ids if k not in seen]:
+        iid, _ = node_ids.pop(key)
+        if tree.exists(iid):  # may already be gone with a deleted parent
+            tree.delete(iid)
+
+    if new_rows:
+        # One Tcl call with the tree frozen, so Tk lays out once
+        with frozen_tree(tree):
+            batch_insert(tree, new_rows)
+            # New rows went in last; move them into place where that is not their spot
+            for parent_iid in {row[0] for row in new_rows}:
+                wanted = child_rows[parent_iid]
+                if list(tree.get_children(parent_iid)) != wanted:
+                    for index, iid in enumerate(wanted):
+                        tree.move(iid, parent_iid, index)
+
+
+class LazyItemTreeMixin:
+    """
+    The lazily filled item tree and parent combobox of the standalone system
+    and technology modelers. Expects self.root, self.model, self.parent_cb,
+    self._combo_after = None and self.tree, whose <<TreeviewOpen>> is bound
+    to on_tree_open().
+
+    refresh_tree() inserts only the roots; an item's attribute rows and
+    children are filled in when its row is opened. _tree_nodes maps
+    (parent iid, full_code) -> iid of every item row inserted so far. Rows
+    are keyed by parent row because 6-digit codes repeat across the tree, so
+    one item can be listed under several rows; show_new_item() and
+    show_attribute() update all of them.
+    """
+
+    def refresh_tree(self):
+        self.tree.delete(*self.tree.get_children())
+        self._tree_nodes = {}
+        roots, children = self.model.children_by_parent()
+        with frozen_tree(self.tree):
+            self.insert_tree_nodes(roots, "", children)
+        self.update_parent_options()
+
+    def insert_tree_nodes(self, items, parent, children):
+        # One batch for the level; items with attributes or children get a placeholder row
+        rows = []
+        for node in items:
+            node_id = self._tree_nodes[(parent, node.full_code)] = new_row_id()
+            rows.append((parent, node_id, f"{node.name} | {node.full_code}", (node.full_code,), ()))
+            if node.attributes or children.get(node.code):
+                rows.append((node_id, new_row_id(), "…", (), (PLACEHOLDER_TAG,)))
+        batch_insert(self.tree, rows)
+
+    def on_tree_open(self, event):
+        node_id = self.tree.focus()
+        if not node_id or self.node_state(node_id) != "collapsed":
+            return
+        self.tree.delete(*self.tree.get_children(node_id))
+        item = self.model.get_item(self.tree.item(node_id, "values")[0])
+        if not item:
+            return
+        # Attribute rows first, then the child items
+        batch_insert(self.tree, [(node_id, new_row_id(), f"Attr: {k} - {v}", (), ())
+                                 for k, v in item.attributes.items()])
+        children = self.model.children_by_parent()[1]
+        self.insert_tree_nodes(children.get(item.code, ()), node_id, children)
+
+    def node_state(self, node_id):
+        """State of a row: collapsed (placeholder only), open (rows filled in) or empty (a leaf so far)."""
+        if node_id == "":
+            return "open"  # the top level is always filled in
+        rows = self.tree.get_children(node_id)
+        if not rows:
+            return "empty"
+        return "collapsed" if PLACEHOLDER_TAG in self.tree.item(rows[0], "tags") else "open"
+
+    def expect_rows(self, node_id):
+        """Make a row that had nothing to show expandable."""
+        self.tree.insert(node_id, "end", iid=new_row_id(), text="…", tags=(PLACEHOLDER_TAG,))
+
+    def update_parent_options(self):
+        items = sorted(self.model.items.values(), key=lambda i: i.full_code)
+        # Kept sorted by full code so show_new_item() can slot new options in
+        self._option_codes = [i.full_code for i in items]
+        self._option_labels = [f"{i.name} | {i.full_code}" for i in items]
+        self.push_parent_options()
+
+    def push_parent_options(self):
+        """Hand the option labels to Tk once the current event is handled; calls made until then share one transfer."""
+        if self._combo_after is None:
+            self._combo_after = self.root.after_idle(self._apply_parent_options)
+
+    def _apply_parent_options(self):
+        self._combo_after = None
+        self.parent_cb["values"] = self._option_labels
+
+    def show_new_item(self, item, parent_code):
+        """Insert just the new item's rows and parent option instead of rebuilding everything."""
+        if parent_code:
+            # Every row of an item with the parent's 6-digit code lists the new item
+            parent6 = parent_code[-6:]
+            parent_ids = [iid for (_, code), iid in self._tree_nodes.items() if code[-6:] == parent6]
+        else:
+            parent_ids = [""]
+        if (any(code == item.full_code for _, code in self._tree_nodes)
+                or (not parent_ids and not self.model.get_item(parent_code))):
+            # create_item replaced an existing item, or the parent is not where we think
+            self.refresh_tree()
+            return
+        # Its 6-digit code may already have children, listed under another item
+        children = self.model.children_by_parent()[1]
+        for parent_id in parent_ids:
+            state = self.node_state(parent_id)
+            if state == "open":
+                # Its index is the highest among its siblings, so it belongs at the end
+                self.insert_tree_nodes([item], parent_id, children)
+            elif state == "empty":
+                self.expect_rows(parent_id)
+        # Collapsed or not yet inserted parents show the item when they are opened
+        position = bisect.bisect(self._option_codes, item.full_code)
+        self._option_codes.insert(position, item.full_code)
+        self._option_labels.insert(position, f"{item.name} | {item.full_code}")
+        self.push_parent_options()
+
+    def show_attribute(self, code, attr_type, is_new):
+        """Add or rewrite just the row of one attribute in every row of an item shown in the tree."""
+        item = self.model.get_item(code)
+        if not item:
+            return
+        # Attribute rows come first under a node, in the order item.attributes lists them
+        attributes = item.attributes
+        position = list(attributes).index(attr_type)
+        text = f"Attr: {attr_type} - {attributes[attr_type]}"
+        for (_, row_code), node_id in self._tree_nodes.items():
+            if row_code != code:
+                continue
+            state = self.node_state(node_id)
+            if state == "empty":
+                self.expect_rows(node_id)
+            elif state == "open":
+                if is_new:
+                    self.tree.insert(node_id, position, iid=new_row_id(), text=text)
+                else:
+                    self.tree.item(self.tree.get_children(node_id)[position], text=text)
+            # A collapsed row shows the attribute when it is opened
+
+
+def fill_rows(tree, row_ids, rows):
+    """
+    Show rows (tuples of column values) as the top-level items of a flat table.
+    Items whose ids are pooled in row_ids are updated and moved into place
+    instead of being deleted and re-created; new ids are added to the pool and
+    rows left over from a longer previous fill are detached, not deleted.
+    """
+    item, move, insert = tree.item, tree.move, tree.insert
+    pooled = len(row_ids)
+    for i, values in enumerate(rows):
+        if i < pooled:
+            iid = row_ids[i]
+            item(iid, values=values)
+            move(iid, "", i)
+        else:
+            row_ids.append(insert("", "end", values=values))
+    if len(rows) < pooled:
+        tree.detach(*row_ids[len(rows):])
+
+
+def patch_listbox(listbox, rows, new_rows):
+    """
+    Change a Listbox showing rows into one showing new_rows, deleting and
+    inserting only the lines that differ. rows must mirror the listbox
+    contents; it is updated in place.
+    """
+    opcodes = SequenceMatcher(None, rows, new_rows, autojunk=False).get_opcodes()
+    # Patch from the bottom up so the indices of earlier ranges stay valid
+    for tag, i1, i2, j1, j2 in reversed(opcodes):
+        if tag == "equal":
+            continue
+        if i2 > i1:
+            listbox.delete(i1, i2 - 1)
+        if j2 > j1:
+            listbox.insert(i1, *new_rows[j1:j2])
+    rows[:] = new_rows
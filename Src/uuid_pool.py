@@ -0,0 +1,21 @@
+"""
+uuid_pool.py
+
+Random (version 4) UUID strings drawn from a pool that is refilled with one
+os.urandom call per batch, instead of one syscall per uuid.uuid4().
+"""
+
+import os
+import uuid
+
+_POOL_SIZE = 1024
+_UUID_POOL = []
+
+
+def new_uuid():
+    """Return a fresh random UUID as a string, like str(uuid.uuid4())."""
+    if not _UUID_POOL:
+        raw = os.urandom(16 * _POOL_SIZE)
+        _UUID_POOL.extend(str(uuid.UUID(bytes=raw[i:i + 16], version=4))
+                          for i in range(0, len(raw), 16))
+    return _UUID_POOL.pop()